@@ -1,19 +1,42 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, Response, g
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
-from googleapiclient.discovery import build
+from spotipy.exceptions import SpotifyException
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import Request, AuthorizedSession
+import requests
+import httplib2
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
 import os
 import json
 import time
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import logging
 from dotenv import load_dotenv
 import uuid
-from contextlib import contextmanager
+import socket
+import re
+import math
+import random
+import functools
+import cProfile
+import hashlib
+import heapq
+import mmap
+import struct
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +50,11 @@ logger = logging.getLogger(__name__)
 
 # Database configuration
 DATABASE_PATH = 'music_transfer.db'
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # safe with WAL, far fewer fsyncs than FULL
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '30'))  # seconds to wait for another process's write lock
+TRANSFER_COMMIT_BATCH_SIZE = int(os.getenv('TRANSFER_COMMIT_BATCH_SIZE', '10'))  # results per write-behind commit
+TRANSFER_SONG_WINDOW = int(os.getenv('TRANSFER_SONG_WINDOW', '100'))  # upcoming songs kept in memory per transfer
 
 # Spotify Configuration
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
@@ -38,8 +66,102 @@ YOUTUBE_CLIENT_ID = os.getenv('YOUTUBE_CLIENT_ID')
 YOUTUBE_CLIENT_SECRET = os.getenv('YOUTUBE_CLIENT_SECRET')
 YOUTUBE_REDIRECT_URI = os.getenv('YOUTUBE_REDIRECT_URI', 'https://127.0.0.1:5000/youtube/callback')
 
+# Background transfer worker configuration
+# TRANSFER_WORKER_MODE: 'thread' runs the worker pool inside the web process,
+# 'external' expects a separate `python worker.py`, 'off' lets the browser drive transfers
+TRANSFER_WORKER_MODE = os.getenv('TRANSFER_WORKER_MODE', 'thread')
+TRANSFER_WORKERS = int(os.getenv('TRANSFER_WORKERS', '2'))
+TRANSFER_POLL_INTERVAL = float(os.getenv('TRANSFER_POLL_INTERVAL', '1.0'))
+TRANSFER_LEASE_SECONDS = int(os.getenv('TRANSFER_LEASE_SECONDS', '120'))  # renewed by a heartbeat every third of this
+
+# Spotify liked-songs fetching
+SPOTIFY_PAGE_SIZE = 50  # maximum allowed by the saved-tracks endpoint
+SPOTIFY_FETCH_WORKERS = int(os.getenv('SPOTIFY_FETCH_WORKERS', '4'))
+SPOTIFY_MAX_RETRIES = int(os.getenv('SPOTIFY_MAX_RETRIES', '5'))
+SONGS_FETCH_TIMEOUT = int(os.getenv('SONGS_FETCH_TIMEOUT', '120'))  # seconds without a stored page before a fetch counts as abandoned
+
+# Server-Sent Events progress stream
+TRANSFER_EVENTS_INTERVAL = float(os.getenv('TRANSFER_EVENTS_INTERVAL', '1.0'))
+TRANSFER_EVENTS_HEARTBEAT = float(os.getenv('TRANSFER_EVENTS_HEARTBEAT', '15'))
+
+# Retry policy and circuit breaker for transient API errors
+API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '4'))
+API_RETRY_BASE_DELAY = float(os.getenv('API_RETRY_BASE_DELAY', '0.5'))  # seconds, doubled per attempt
+API_RETRY_MAX_DELAY = float(os.getenv('API_RETRY_MAX_DELAY', '30'))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))  # consecutive failures
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '30'))
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Concurrent inserts into one playlist answer 409 Conflict without applying the insert
+RETRYABLE_YOUTUBE_STATUS_CODES = RETRYABLE_STATUS_CODES | {409}
+RETRYABLE_ERROR_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'backendError', 'internalError'}
+
+# Tracing and profiling (both opt-in)
+TRACE_FILE = os.getenv('TRACE_FILE')  # JSON-lines span log, unset disables tracing
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', 'off')  # off, header (X-Profile: 1) or always
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILED_ENDPOINTS = {'process_transfer', 'fetch_songs'}
+
+# HTTP transport configuration (shared keep-alive connection pool)
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '20'))  # connections kept per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+HTTP_CONNECT_RETRIES = int(os.getenv('HTTP_CONNECT_RETRIES', '3'))
+YOUTUBE_HTTP_TRANSPORT = os.getenv('YOUTUBE_HTTP_TRANSPORT', 'requests')  # requests = pooled, httplib2 = one client per thread
+
+# Cached Spotify profile shown on the dashboard
+SPOTIFY_PROFILE_TTL = int(os.getenv('SPOTIFY_PROFILE_TTL', '3600'))  # seconds before a background refresh
+
+# OAuth token refresh
+TOKEN_REFRESH_MARGIN = int(os.getenv('TOKEN_REFRESH_MARGIN', '300'))  # seconds before expiry
+TOKEN_REFRESH_INTERVAL = float(os.getenv('TOKEN_REFRESH_INTERVAL', '60'))  # background sweep, 0 disables
+
+# Per-session API client cache
+CLIENT_CACHE_SIZE = int(os.getenv('CLIENT_CACHE_SIZE', '256'))
+CLIENT_CACHE_TTL = int(os.getenv('CLIENT_CACHE_TTL', '1800'))  # seconds
+
+# YouTube request throttling and concurrent search configuration
+YOUTUBE_RATE_LIMIT = float(os.getenv('YOUTUBE_RATE_LIMIT', '5'))  # requests per second
+YOUTUBE_RATE_BURST = int(os.getenv('YOUTUBE_RATE_BURST', '10'))
+YOUTUBE_SEARCH_WORKERS = int(os.getenv('YOUTUBE_SEARCH_WORKERS', '4'))
+TRANSFER_SEARCH_BATCH_SIZE = int(os.getenv('TRANSFER_SEARCH_BATCH_SIZE', '20'))
+YOUTUBE_BATCH_SIZE = int(os.getenv('YOUTUBE_BATCH_SIZE', '50'))  # requests per HTTP batch, 1 disables batching
+# YouTube applies the parts of a batch in any order, so ordered transfers insert one video at a time
+TRANSFER_ORDERED_INSERTS = os.getenv('TRANSFER_ORDERED_INSERTS', 'true').lower() == 'true'
+
+# Search candidate ranking (costs one extra videos.list unit per search)
+YOUTUBE_RANK_CANDIDATES = os.getenv('YOUTUBE_RANK_CANDIDATES', 'true').lower() == 'true'
+YOUTUBE_SEARCH_RESULTS = int(os.getenv('YOUTUBE_SEARCH_RESULTS', '5'))
+MATCH_DURATION_TOLERANCE_MS = int(os.getenv('MATCH_DURATION_TOLERANCE_MS', '30000'))
+# Words that usually mean "not the studio recording" unless the Spotify title has them too
+MATCH_PENALTY_WORDS = {'cover', 'live', 'karaoke', 'remix', 'instrumental', 'nightcore', 'slowed', 'reverb', 'sped', '8d', 'loop', 'hour', 'hours', 'reaction', 'tutorial'}
+
+# Cross-session Spotify track -> YouTube video match cache
+MATCH_CACHE_TTL_DAYS = int(os.getenv('MATCH_CACHE_TTL_DAYS', '90'))
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv('MATCH_CACHE_MAX_ENTRIES', '200000'))
+MATCH_CACHE_PRUNE_INTERVAL = int(os.getenv('MATCH_CACHE_PRUNE_INTERVAL', '500'))  # inserts between evictions
+
+# Offline Spotify id / ISRC -> YouTube video mapping index, built by import_mappings.py
+MAPPING_INDEX_FILE = os.getenv('MAPPING_INDEX_FILE', 'mapping_index.bin')
+MAPPING_INDEX_MAGIC = b'MTMAP001'
+MAPPING_INDEX_HEADER = struct.Struct('>8sQ')  # magic, record count
+MAPPING_INDEX_KEY_SIZE = 8  # blake2b digest of "spotify:<id>" or "isrc:<ISRC>"
+MAPPING_INDEX_RECORD_SIZE = MAPPING_INDEX_KEY_SIZE + 11  # key, then the 11-character video id
+
+# YouTube Data API quota (units per day, reset at midnight Pacific time)
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+YOUTUBE_QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+YOUTUBE_QUOTA_COSTS = {
+    'search.list': 100,
+    'playlists.insert': 50,
+    'playlists.list': 1,
+    'playlistItems.insert': 50,
+    'playlistItems.list': 1,
+    'playlistItems.delete': 50,
+    'videos.list': 1
+}
+
 # OAuth2 Scopes - Updated to include the scopes Google automatically adds
-SPOTIFY_SCOPES = 'user-library-read user-read-private user-read-email'
+SPOTIFY_SCOPES = 'user-library-read playlist-read-private playlist-read-collaborative user-read-private user-read-email'
 YOUTUBE_SCOPES = [
     'https://www.googleapis.com/auth/youtube',
     'openid',
@@ -47,16 +169,255 @@ YOUTUBE_SCOPES = [
     'https://www.googleapis.com/auth/userinfo.profile'
 ]
 
+METRIC_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class MetricsRegistry:
+    """In-process counters, gauges and latency histograms rendered in Prometheus text format
+
+    Values are per process: with TRANSFER_WORKER_MODE=external the worker keeps its own.
+    """
+    
+    def __init__(self, buckets=METRIC_BUCKETS):
+        self.buckets = buckets
+        self._help = {}
+        self._types = {}
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+    
+    def describe(self, name, metric_type, help_text):
+        self._help[name] = help_text
+        self._types[name] = metric_type
+    
+    def inc(self, name, value=1, **labels):
+        """Increment a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def observe(self, name, seconds, **labels):
+        """Record one latency observation in a histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+    
+    @contextmanager
+    def time(self, name, **labels):
+        """Time the enclosed block into a histogram"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+    
+    def gauge(self, name, func):
+        """Register a gauge whose value is read from func() at scrape time
+
+        func returns a number, or a dict of {label tuple: value}.
+        """
+        self._gauges[name] = func
+    
+    def _format_labels(self, labels):
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+    
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(value[0]), value[1], value[2]) for key, value in self._histograms.items()}
+        
+        series = {}
+        for (name, labels), value in counters.items():
+            series.setdefault(name, []).append(f"{name}{self._format_labels(labels)} {value}")
+        
+        for (name, labels), (bucket_counts, total, count) in histograms.items():
+            lines = series.setdefault(name, [])
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f"{name}_bucket{self._format_labels(labels + (('le', bound),))} {bucket_count}")
+            lines.append(f"{name}_bucket{self._format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {total}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        
+        for name, func in self._gauges.items():
+            try:
+                value = func()
+            except Exception as e:
+                logger.error(f"Error reading gauge {name}: {e}")
+                continue
+            values = value.items() if isinstance(value, dict) else [((), value)]
+            series[name] = [f"{name}{self._format_labels(labels)} {gauge_value}" for labels, gauge_value in values]
+        
+        output = []
+        for name in sorted(series):
+            if name in self._help:
+                output.append(f"# HELP {name} {self._help[name]}")
+                output.append(f"# TYPE {name} {self._types[name]}")
+            output.extend(series[name])
+        return '\n'.join(output) + '\n'
+
+metrics = MetricsRegistry()
+metrics.describe('music_transfer_spotify_page_seconds', 'histogram', 'Latency of Spotify saved-tracks page fetches')
+metrics.describe('music_transfer_youtube_request_seconds', 'histogram', 'Latency of YouTube Data API calls by method')
+metrics.describe('music_transfer_db_seconds', 'histogram', 'Latency of DatabaseManager methods')
+metrics.describe('music_transfer_quota_units_total', 'counter', 'YouTube quota units charged by method')
+metrics.describe('music_transfer_match_cache_total', 'counter', 'Match cache lookups by result')
+metrics.describe('music_transfer_retries_total', 'counter', 'Retried API calls by upstream')
+metrics.describe('music_transfer_songs_total', 'counter', 'Transferred songs by result status')
+metrics.describe('music_transfer_active_transfers', 'gauge', 'Transfers currently being processed')
+metrics.describe('music_transfer_queue_depth', 'gauge', 'Transfers waiting for a worker, including quota-paused ones')
+
+class Tracer:
+    """Opt-in span recorder writing one JSON line per finished span to a trace file
+
+    Spans nest per thread. Attributes given to a span (transfer_id, song_id, ...) are
+    inherited by the spans opened inside it; snapshot()/attach() carry a trace into
+    pool threads.
+    """
+    
+    def __init__(self, path=TRACE_FILE):
+        self.path = path
+        self.enabled = bool(path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = None
+    
+    def _state(self):
+        state = self._local
+        if not hasattr(state, 'stack'):
+            state.trace_id = None
+            state.stack = []
+            state.attrs = {}
+        return state
+    
+    def span(self, name, **attrs):
+        """Context manager recording a span (a no-op unless tracing is enabled)"""
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, attrs)
+    
+    @contextmanager
+    def _span(self, name, attrs):
+        state = self._state()
+        new_trace = state.trace_id is None
+        if new_trace:
+            state.trace_id = uuid.uuid4().hex
+        span_id = uuid.uuid4().hex[:16]
+        parent_id = state.stack[-1] if state.stack else None
+        saved_attrs = state.attrs
+        state.attrs = {**saved_attrs, **attrs}
+        state.stack.append(span_id)
+        started_at = time.time()
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            record = {
+                'trace_id': state.trace_id,
+                'span_id': span_id,
+                'parent_id': parent_id,
+                'name': name,
+                'start': started_at,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+                'thread': threading.current_thread().name,
+                **state.attrs
+            }
+            if error:
+                record['error'] = error
+            state.stack.pop()
+            state.attrs = saved_attrs
+            if new_trace:
+                state.trace_id = None
+            self._write(record)
+    
+    def annotate(self, **attrs):
+        """Add attributes to the innermost open span"""
+        if self.enabled:
+            self._state().attrs.update(attrs)
+    
+    def snapshot(self):
+        """Capture the current trace so another thread can attach() to it"""
+        if not self.enabled:
+            return None
+        state = self._state()
+        return state.trace_id, (state.stack[-1] if state.stack else None), dict(state.attrs)
+    
+    @contextmanager
+    def attach(self, snapshot):
+        """Continue a trace captured with snapshot() in the current thread"""
+        if snapshot is None:
+            yield
+            return
+        state = self._state()
+        saved = (state.trace_id, state.stack, state.attrs)
+        trace_id, parent_id, attrs = snapshot
+        state.trace_id, state.stack, state.attrs = trace_id, [parent_id] if parent_id else [], attrs
+        try:
+            yield
+        finally:
+            state.trace_id, state.stack, state.attrs = saved
+    
+    def _write(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', buffering=1)
+            self._file.write(line)
+
+tracer = Tracer()
+
+@contextmanager
+def instrument(histogram, span_name, **labels):
+    """Time a block into a latency histogram and, when tracing is on, a span"""
+    with metrics.time(histogram, **labels), tracer.span(span_name):
+        yield
+
+def instrument_methods(histogram, exclude=()):
+    """Class decorator timing every public method into a histogram labelled by method (and a span)"""
+    def decorate(cls):
+        for name, func in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(func):
+                continue
+            
+            def wrap(func, name=name):
+                @functools.wraps(func)
+                def timed(*args, **kwargs):
+                    with instrument(histogram, f"db.{name}", method=name):
+                        return func(*args, **kwargs)
+                return timed
+            
+            setattr(cls, name, wrap(func))
+        return cls
+    return decorate
+
+@instrument_methods('music_transfer_db_seconds', exclude=('get_db_connection', 'init_database'))
 class DatabaseManager:
     def __init__(self, db_path):
         self.db_path = db_path
+        self._match_cache_inserts = 0
+        self._match_cache_lock = threading.Lock()
         self.init_database()
     
     @contextmanager
     def get_db_connection(self):
         """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT)
         conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA synchronous = {SQLITE_SYNCHRONOUS}')
+        conn.execute(f'PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}')
         try:
             yield conn
         finally:
@@ -67,6 +428,9 @@ class DatabaseManager:
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
             
+            # WAL lets readers (status polling) proceed while a worker writes; the mode is persistent
+            cursor.execute('PRAGMA journal_mode = WAL')
+            
             # User sessions table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS user_sessions (
@@ -79,19 +443,33 @@ class DatabaseManager:
                 )
             ''')
             
-            # Songs table
+            # Track catalog shared by all sessions, one row per Spotify track
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS songs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT,
-                    spotify_id TEXT,
+                CREATE TABLE IF NOT EXISTS tracks (
+                    spotify_id TEXT PRIMARY KEY,
                     name TEXT,
                     artist TEXT,
                     album TEXT,
                     duration_ms INTEGER,
                     external_url TEXT,
+                    isrc TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Songs table: which catalog tracks are in a session's liked songs or one of
+            # its playlists (`source` is 'liked' or a Spotify playlist id), and where
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS songs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT,
+                    source TEXT DEFAULT 'liked',
+                    spotify_id TEXT,
+                    position INTEGER,
+                    added_at TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (session_id) REFERENCES user_sessions (id)
+                    FOREIGN KEY (session_id) REFERENCES user_sessions (id),
+                    FOREIGN KEY (spotify_id) REFERENCES tracks (spotify_id)
                 )
             ''')
             
@@ -107,6 +485,16 @@ class DatabaseManager:
                     successful INTEGER DEFAULT 0,
                     failed INTEGER DEFAULT 0,
                     status TEXT DEFAULT 'pending',
+                    min_song_id INTEGER DEFAULT 0,
+                    max_song_id INTEGER,
+                    last_song_id INTEGER DEFAULT 0,
+                    source TEXT DEFAULT 'liked',
+                    bulk_id INTEGER,
+                    sync BOOLEAN DEFAULT 0,
+                    remove_missing BOOLEAN DEFAULT 0,
+                    removed INTEGER DEFAULT 0,
+                    playlist_requested BOOLEAN DEFAULT 0,
+                    follows_fetch BOOLEAN DEFAULT 0,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (session_id) REFERENCES user_sessions (id)
@@ -119,20 +507,168 @@ class DatabaseManager:
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     transfer_id INTEGER,
                     song_id INTEGER,
+                    spotify_id TEXT,
                     youtube_video_id TEXT,
                     youtube_title TEXT,
                     youtube_channel TEXT,
                     youtube_thumbnail TEXT,
                     status TEXT,
                     added_to_playlist BOOLEAN DEFAULT FALSE,
+                    match_score REAL,
+                    match_candidates TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (transfer_id) REFERENCES transfers (id),
                     FOREIGN KEY (song_id) REFERENCES songs (id)
                 )
             ''')
             
+            # Write-ahead journal of each song's search result and playlist insert, so a
+            # resumed transfer neither repeats paid searches nor inserts a video twice.
+            # Rows are dropped once the song's result is recorded in transfer_results.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transfer_journal (
+                    transfer_id INTEGER,
+                    song_id INTEGER,
+                    youtube_match TEXT,
+                    state TEXT DEFAULT 'searched',
+                    added_to_playlist BOOLEAN,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (transfer_id, song_id)
+                )
+            ''')
+            
+            # Columns added after the first release
+            self._ensure_column(cursor, 'songs', 'added_at', 'TEXT')
+            self._ensure_column(cursor, 'transfers', 'min_song_id', 'INTEGER DEFAULT 0')
+            self._ensure_column(cursor, 'transfers', 'max_song_id', 'INTEGER')
+            if self._ensure_column(cursor, 'transfers', 'last_song_id', 'INTEGER DEFAULT 0'):
+                # Seed the cursor of transfers that were already under way
+                cursor.execute('''
+                    UPDATE transfers SET last_song_id = COALESCE(
+                        (SELECT MAX(song_id) FROM transfer_results WHERE transfer_id = transfers.id), 0
+                    )
+                ''')
+            
+            self._migrate_songs_to_tracks(cursor)
+            self._ensure_column(cursor, 'songs', 'source', "TEXT DEFAULT 'liked'")
+            self._ensure_column(cursor, 'transfers', 'source', "TEXT DEFAULT 'liked'")
+            self._ensure_column(cursor, 'transfers', 'bulk_id', 'INTEGER')
+            self._ensure_column(cursor, 'transfers', 'sync', 'BOOLEAN DEFAULT 0')
+            self._ensure_column(cursor, 'transfers', 'remove_missing', 'BOOLEAN DEFAULT 0')
+            self._ensure_column(cursor, 'transfers', 'removed', 'INTEGER DEFAULT 0')
+            self._ensure_column(cursor, 'transfers', 'playlist_requested', 'BOOLEAN DEFAULT 0')
+            self._ensure_column(cursor, 'tracks', 'isrc', 'TEXT')
+            
+            # One row per track per session and source so re-fetches can upsert in place
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_songs_session_source_spotify'")
+            if not cursor.fetchone():
+                cursor.execute('''
+                    DELETE FROM songs WHERE id NOT IN (
+                        SELECT MIN(id) FROM songs GROUP BY session_id, source, spotify_id
+                    )
+                ''')
+                cursor.execute('DROP INDEX IF EXISTS idx_songs_session_spotify')
+                cursor.execute('CREATE UNIQUE INDEX idx_songs_session_source_spotify ON songs (session_id, source, spotify_id)')
+            
+            # Indexes for the per-session and per-transfer lookups on the hot path
+            cursor.execute('DROP INDEX IF EXISTS idx_songs_session')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_songs_session_source ON songs (session_id, source)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transfers_session_status ON transfers (session_id, status)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transfer_results_transfer ON transfer_results (transfer_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transfers_bulk ON transfers (bulk_id)')
+            
+            # Global match cache shared by all sessions, keyed by Spotify id and normalized query
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS match_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    youtube_video_id TEXT,
+                    youtube_title TEXT,
+                    youtube_channel TEXT,
+                    youtube_thumbnail TEXT,
+                    match_score REAL,
+                    match_candidates TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_match_cache_last_used ON match_cache (last_used_at)')
+            self._ensure_column(cursor, 'match_cache', 'match_score', 'REAL')
+            self._ensure_column(cursor, 'match_cache', 'match_candidates', 'TEXT')
+            self._ensure_column(cursor, 'transfer_results', 'match_score', 'REAL')
+            self._ensure_column(cursor, 'transfer_results', 'match_candidates', 'TEXT')
+            if self._ensure_column(cursor, 'transfer_results', 'spotify_id', 'TEXT'):
+                # Song rows are deleted when Spotify is disconnected, so results keep the track id itself
+                cursor.execute('''
+                    UPDATE transfer_results SET spotify_id = (SELECT spotify_id FROM songs WHERE id = song_id)
+                ''')
+            self._ensure_column(cursor, 'user_sessions', 'spotify_profile', 'TEXT')
+            self._ensure_column(cursor, 'transfers', 'lease_owner', 'TEXT')
+            self._ensure_column(cursor, 'transfers', 'lease_expires_at', 'REAL')
+            self._ensure_column(cursor, 'user_sessions', 'spotify_profile_fetched_at', 'REAL')
+            self._ensure_column(cursor, 'user_sessions', 'songs_fetch_heartbeat', 'REAL')
+            self._ensure_column(cursor, 'transfers', 'follows_fetch', 'BOOLEAN DEFAULT 0')
+            
+            # Daily YouTube quota ledger, one row per Pacific-time day and API method
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS quota_usage (
+                    quota_day TEXT,
+                    method TEXT,
+                    calls INTEGER DEFAULT 0,
+                    units INTEGER DEFAULT 0,
+                    PRIMARY KEY (quota_day, method)
+                )
+            ''')
+            
             conn.commit()
     
+    def _migrate_songs_to_tracks(self, cursor):
+        """Move track metadata from per-session song rows into the shared catalog
+
+        Databases from before the catalog kept a full copy of every track per session.
+        The songs table is rebuilt without those columns, keeping its row ids since
+        transfers and their results refer to them.
+        """
+        cursor.execute('PRAGMA table_info(songs)')
+        if 'name' not in [row['name'] for row in cursor.fetchall()]:
+            return
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO tracks (spotify_id, name, artist, album, duration_ms, external_url)
+            SELECT spotify_id, name, artist, album, duration_ms, external_url FROM songs
+            WHERE id IN (SELECT MAX(id) FROM songs GROUP BY spotify_id)
+        ''')
+        cursor.execute('''
+            CREATE TABLE songs_slim (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT,
+                spotify_id TEXT,
+                position INTEGER,
+                added_at TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (session_id) REFERENCES user_sessions (id),
+                FOREIGN KEY (spotify_id) REFERENCES tracks (spotify_id)
+            )
+        ''')
+        # Songs were stored in library order, so their ids give the positions
+        cursor.execute('''
+            INSERT INTO songs_slim (id, session_id, spotify_id, position, added_at, created_at)
+            SELECT id, session_id, spotify_id,
+                   ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY id) - 1, added_at, created_at
+            FROM songs
+        ''')
+        # Copy-and-rename rather than renaming songs, which would repoint transfer_results' reference
+        cursor.execute('DROP TABLE songs')
+        cursor.execute('ALTER TABLE songs_slim RENAME TO songs')
+        logger.info("Moved song metadata into the shared track catalog")
+    
+    def _ensure_column(self, cursor, table, column, definition):
+        """Add a column to an existing table if an older database lacks it"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in [row['name'] for row in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+            return True
+        return False
+    
     def get_or_create_session(self, session_id):
         """Get or create a user session"""
         with self.get_db_connection() as conn:
@@ -152,16 +688,27 @@ class DatabaseManager:
             return dict(result) if result else None
     
     def update_spotify_token(self, session_id, token_info, user_id=None):
-        """Update Spotify token for a session"""
+        """Update Spotify token for a session (user_id=None keeps the stored user)"""
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE user_sessions 
-                SET spotify_token = ?, spotify_user_id = ?, updated_at = CURRENT_TIMESTAMP
+                SET spotify_token = ?, spotify_user_id = COALESCE(?, spotify_user_id), updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (json.dumps(token_info), user_id, session_id))
             conn.commit()
     
+    def update_spotify_profile(self, session_id, profile):
+        """Cache the Spotify user profile shown on the dashboard"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE user_sessions
+                SET spotify_profile = ?, spotify_profile_fetched_at = ?
+                WHERE id = ?
+            ''', (json.dumps(profile), time.time(), session_id))
+            conn.commit()
+    
     def update_youtube_credentials(self, session_id, credentials):
         """Update YouTube credentials for a session"""
         with self.get_db_connection() as conn:
@@ -189,36 +736,143 @@ class DatabaseManager:
             result = cursor.fetchone()
             return json.loads(result['youtube_credentials']) if result and result['youtube_credentials'] else None
     
-    def store_songs(self, session_id, songs):
-        """Store songs for a session"""
+    def store_songs(self, session_id, songs, replace=True, start_position=0, prepend=False, source='liked'):
+        """Upsert songs for a session, keeping the row ids of tracks that are already stored
+
+        Track metadata goes to the shared catalog, where rows are only rewritten when
+        Spotify changed them; the session just records membership of `source` (liked
+        songs or a playlist id). `songs` sit at positions `start_position` onwards.
+        With replace=True (a full fetch) tracks that are no longer in the source are
+        removed; otherwise only the given songs are added, and prepend=True (a delta
+        sync of newly liked tracks) moves the rest of the source down to make room.
+        """
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Clear existing songs for this session
-            cursor.execute('DELETE FROM songs WHERE session_id = ?', (session_id,))
+            cursor.executemany('''
+                INSERT INTO tracks (spotify_id, name, artist, album, duration_ms, external_url, isrc)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (spotify_id) DO UPDATE SET
+                    name = excluded.name,
+                    artist = excluded.artist,
+                    album = excluded.album,
+                    duration_ms = excluded.duration_ms,
+                    external_url = excluded.external_url,
+                    isrc = excluded.isrc,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE (name, artist, album, duration_ms, external_url, isrc) IS NOT
+                      (excluded.name, excluded.artist, excluded.album, excluded.duration_ms, excluded.external_url,
+                       excluded.isrc)
+            ''', [(
+                song['id'],
+                song['name'],
+                song['artist'],
+                song['album'],
+                song['duration_ms'],
+                song['external_url'],
+                song.get('isrc')
+            ) for song in songs])
             
-            # Insert new songs
-            for song in songs:
-                cursor.execute('''
-                    INSERT INTO songs (session_id, spotify_id, name, artist, album, duration_ms, external_url)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    session_id,
-                    song['id'],
-                    song['name'],
-                    song['artist'],
-                    song['album'],
-                    song['duration_ms'],
-                    song['external_url']
-                ))
+            if prepend:
+                cursor.execute(
+                    'UPDATE songs SET position = position + ? WHERE session_id = ? AND source = ?',
+                    (len(songs), session_id, source)
+                )
+            
+            cursor.executemany('''
+                INSERT INTO songs (session_id, source, spotify_id, position, added_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (session_id, source, spotify_id) DO UPDATE SET
+                    position = excluded.position,
+                    added_at = excluded.added_at
+                WHERE (position, added_at) IS NOT (excluded.position, excluded.added_at)
+            ''', [(
+                session_id,
+                source,
+                song['id'],
+                start_position + i,
+                song.get('added_at')
+            ) for i, song in enumerate(songs)])
             
+            if replace:
+                self._remove_songs_not_in(cursor, session_id, [song['id'] for song in songs], source)
+            
+            conn.commit()
+    
+    def remove_songs_not_in(self, session_id, spotify_ids, source='liked'):
+        """Remove a session's songs that are no longer in its library (or the given playlist)"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            self._remove_songs_not_in(cursor, session_id, spotify_ids, source)
+            conn.commit()
+    
+    def _remove_songs_not_in(self, cursor, session_id, spotify_ids, source):
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS fetched_songs (spotify_id TEXT PRIMARY KEY)')
+        cursor.execute('DELETE FROM fetched_songs')
+        cursor.executemany(
+            'INSERT OR IGNORE INTO fetched_songs (spotify_id) VALUES (?)',
+            [(spotify_id,) for spotify_id in spotify_ids]
+        )
+        cursor.execute('''
+            DELETE FROM songs
+            WHERE session_id = ? AND source = ? AND spotify_id NOT IN (SELECT spotify_id FROM fetched_songs)
+        ''', (session_id, source))
+    
+    def get_songs_watermark(self, session_id):
+        """Get the newest Spotify added_at timestamp stored for a session"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(added_at) FROM songs WHERE session_id = ? AND source = 'liked'", (session_id,))
+            return cursor.fetchone()[0]
+    
+    def count_songs(self, session_id, source='liked'):
+        """Count the songs stored for a session"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM songs WHERE session_id = ? AND source = ?', (session_id, source))
+            return cursor.fetchone()[0]
+    
+    def mark_songs_fetch(self, session_id, in_progress=True):
+        """Record that a full liked-songs fetch stored a page (or finished) for a session"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE user_sessions SET songs_fetch_heartbeat = ? WHERE id = ?',
+                (time.time() if in_progress else None, session_id)
+            )
             conn.commit()
     
-    def get_songs(self, session_id):
-        """Get songs for a session"""
+    def is_fetching_songs(self, session_id):
+        """Check whether a liked-songs fetch is still storing pages for a session"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT songs_fetch_heartbeat FROM user_sessions WHERE id = ?', (session_id,))
+            result = cursor.fetchone()
+            heartbeat = result['songs_fetch_heartbeat'] if result else None
+            return heartbeat is not None and time.time() - heartbeat < SONGS_FETCH_TIMEOUT
+    
+    def get_songs(self, session_id, after_id=0, up_to_id=None, limit=None, source='liked'):
+        """Get a session's liked songs (or a playlist's), optionally limited to a range of song ids"""
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM songs WHERE session_id = ? ORDER BY id', (session_id,))
+            query = '''
+                SELECT s.id, s.spotify_id, s.position, s.added_at,
+                       t.name, t.artist, t.album, t.duration_ms, t.external_url, t.isrc
+                FROM songs s
+                JOIN tracks t ON t.spotify_id = s.spotify_id
+                WHERE s.session_id = ? AND s.source = ? AND s.id > ?
+            '''
+            params = [session_id, source, after_id or 0]
+            
+            if up_to_id is not None:
+                query += ' AND s.id <= ?'
+                params.append(up_to_id)
+            query += ' ORDER BY s.id'
+            if limit is not None:
+                query += ' LIMIT ?'
+                params.append(limit)
+            
+            cursor.execute(query, params)
             results = cursor.fetchall()
             
             songs = []
@@ -230,30 +884,328 @@ class DatabaseManager:
                     'album': row['album'],
                     'duration_ms': row['duration_ms'],
                     'external_url': row['external_url'],
+                    'isrc': row['isrc'],
+                    'added_at': row['added_at'],
+                    'position': row['position'],
                     'db_id': row['id']
                 })
             
             return songs
     
-    def create_transfer(self, session_id, playlist_id, playlist_name, total_songs):
-        """Create a new transfer record"""
+    def create_transfer(self, session_id, playlist_id, playlist_name, total_songs, status='pending',
+                        min_song_id=0, max_song_id=None, source='liked', sync=False, remove_missing=False,
+                        follows_fetch=False):
+        """Create a new transfer record covering songs with min_song_id < id <= max_song_id
+
+        A sync transfer diffs the songs against an existing playlist's contents instead
+        of inserting every one, optionally removing videos of songs that were un-liked.
+        A transfer that follows a fetch still in progress leaves max_song_id open until
+        the fetch finishes (see refresh_followed_transfer).
+        """
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO transfers (session_id, playlist_id, playlist_name, total_songs)
-                VALUES (?, ?, ?, ?)
-            ''', (session_id, playlist_id, playlist_name, total_songs))
+                INSERT INTO transfers
+                (session_id, playlist_id, playlist_name, total_songs, status, min_song_id, max_song_id,
+                 source, sync, remove_missing, follows_fetch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (session_id, playlist_id, playlist_name, total_songs, status, min_song_id, max_song_id,
+                  source, sync, remove_missing, follows_fetch))
             conn.commit()
             return cursor.lastrowid
     
+    def create_bulk_transfer(self, session_id, targets, status='queued'):
+        """Create one transfer per source in a single transaction, grouped under the first one's id
+
+        Each target is a dict with source, playlist_name, total_songs and max_song_id;
+        the YouTube playlist is created when the transfer starts. Returns the bulk id
+        and the transfer ids in target order.
+        """
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            transfer_ids = []
+            for target in targets:
+                cursor.execute('''
+                    INSERT INTO transfers
+                    (session_id, playlist_id, playlist_name, total_songs, status, max_song_id, source, bulk_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    session_id, None, target['playlist_name'], target['total_songs'], status,
+                    target['max_song_id'], target['source'], transfer_ids[0] if transfer_ids else None
+                ))
+                transfer_ids.append(cursor.lastrowid)
+            
+            cursor.execute('UPDATE transfers SET bulk_id = ? WHERE id = ?', (transfer_ids[0], transfer_ids[0]))
+            conn.commit()
+            return transfer_ids[0], transfer_ids
+    
+    def get_unliked_playlist_videos(self, session_id, playlist_id, source='liked'):
+        """Get videos this app added to a playlist for tracks that are no longer in the library
+
+        Tracks are compared by Spotify id, since song rows are recreated when Spotify is
+        reconnected. Videos that are also the recorded match of a track still in the
+        library are kept, and nothing is reported while the library is empty.
+        """
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT DISTINCT tr.youtube_video_id
+                FROM transfer_results tr
+                JOIN transfers t ON tr.transfer_id = t.id
+                WHERE t.session_id = ? AND t.playlist_id = ? AND tr.added_to_playlist
+                  AND tr.spotify_id IS NOT NULL
+                  AND EXISTS (SELECT 1 FROM songs s WHERE s.session_id = ? AND s.source = ?)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM songs s
+                      WHERE s.session_id = ? AND s.source = ? AND s.spotify_id = tr.spotify_id
+                  )
+                  AND tr.youtube_video_id NOT IN (
+                      SELECT kept.youtube_video_id
+                      FROM transfer_results kept
+                      JOIN transfers kt ON kept.transfer_id = kt.id
+                      JOIN songs ks
+                        ON ks.session_id = kt.session_id AND ks.source = ? AND ks.spotify_id = kept.spotify_id
+                      WHERE kt.session_id = ? AND kt.playlist_id = ? AND kept.youtube_video_id IS NOT NULL
+                  )
+            ''', (session_id, playlist_id, session_id, source, session_id, source, source, session_id, playlist_id))
+            return {row[0] for row in cursor.fetchall()}
+    
+    def add_transfer_removed(self, transfer_id, count):
+        """Count playlist items a sync transfer removed"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE transfers SET removed = removed + ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (count, transfer_id)
+            )
+            conn.commit()
+    
+    def mark_transfer_playlist_requested(self, transfer_id):
+        """Journal that a transfer is about to create its YouTube playlist"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE transfers SET playlist_requested = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (transfer_id,)
+            )
+            conn.commit()
+    
+    def set_transfer_playlist(self, transfer_id, playlist_id):
+        """Record the YouTube playlist a transfer created when it started"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE transfers SET playlist_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (playlist_id, transfer_id)
+            )
+            conn.commit()
+    
+    def get_bulk_transfers(self, bulk_id, session_id):
+        """Get the transfers of a bulk transfer, in the order they run"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM transfers WHERE bulk_id = ? AND session_id = ? ORDER BY id',
+                (bulk_id, session_id)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_bulk_matches(self, bulk_id, spotify_ids):
+        """Get matches already recorded by a bulk transfer's playlists, keyed by Spotify id
+
+        Tracks that were searched but not found map to None, so they are not searched again.
+        """
+        if not spotify_ids:
+            return {}
+        
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ', '.join('?' * len(spotify_ids))
+            cursor.execute(f'''
+                SELECT s.spotify_id, tr.youtube_video_id, tr.youtube_title, tr.youtube_channel,
+                       tr.youtube_thumbnail, tr.match_score, tr.match_candidates
+                FROM transfer_results tr
+                JOIN transfers t ON tr.transfer_id = t.id
+                JOIN songs s ON tr.song_id = s.id
+                WHERE t.bulk_id = ? AND s.spotify_id IN ({placeholders})
+                ORDER BY tr.id
+            ''', [bulk_id, *spotify_ids])
+            
+            matches = {}
+            for row in cursor.fetchall():
+                matches[row['spotify_id']] = {
+                    'video_id': row['youtube_video_id'],
+                    'title': row['youtube_title'],
+                    'channel': row['youtube_channel'],
+                    'thumbnail': row['youtube_thumbnail'],
+                    'score': row['match_score'],
+                    'candidates': json.loads(row['match_candidates'] or '[]')
+                } if row['youtube_video_id'] else None
+            return matches
+    
+    def get_latest_transfer(self, session_id, source=None, include_bulk=True):
+        """Get the most recent transfer for a session, whatever its status
+
+        Optionally limited to one source (liked songs or a playlist id) and to
+        transfers that are not part of a bulk transfer.
+        """
+        query = 'SELECT * FROM transfers WHERE session_id = ?'
+        params = [session_id]
+        if source is not None:
+            query += ' AND source = ?'
+            params.append(source)
+        if not include_bulk:
+            query += ' AND bulk_id IS NULL'
+        query += ' ORDER BY created_at DESC, id DESC LIMIT 1'
+        
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            result = cursor.fetchone()
+            return dict(result) if result else None
+    
+    def refresh_followed_transfer(self, transfer, finished):
+        """Count the songs stored so far for a transfer that follows a fetch
+
+        Once the fetch has finished the transfer's range is closed at the last stored
+        song and it stops following. Returns the updated fields.
+        """
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT COUNT(*), MAX(id) FROM songs WHERE session_id = ? AND source = ? AND id > ?',
+                (transfer['session_id'], transfer.get('source') or 'liked', transfer['min_song_id'] or 0)
+            )
+            total_songs, max_song_id = cursor.fetchone()
+            
+            if finished:
+                fields = {
+                    'total_songs': total_songs,
+                    'max_song_id': max_song_id or transfer['min_song_id'] or 0,
+                    'follows_fetch': 0
+                }
+                cursor.execute('''
+                    UPDATE transfers SET total_songs = ?, max_song_id = ?, follows_fetch = 0,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (total_songs, fields['max_song_id'], transfer['id']))
+            else:
+                fields = {'total_songs': total_songs}
+                cursor.execute(
+                    'UPDATE transfers SET total_songs = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                    (total_songs, transfer['id'])
+                )
+            conn.commit()
+            return fields
+    
+    def get_transfer_song_range_end(self, transfer):
+        """Get the last song id covered by a transfer (older transfers did not record it)"""
+        if transfer.get('max_song_id') is not None:
+            return transfer['max_song_id']
+        
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT MAX(id) FROM songs WHERE session_id = ? AND source = ? AND created_at <= ?',
+                (transfer['session_id'], transfer.get('source') or 'liked', transfer['created_at'])
+            )
+            return cursor.fetchone()[0] or 0
+    
+    def claim_next_transfer(self, owner, lease_seconds, include_paused=False):
+        """Atomically claim the oldest queued transfer (or one whose lease expired) for a worker"""
+        now = time.time()
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            # A bulk transfer's playlists run one after another, so each reuses the matches
+            # of the ones before it instead of searching the same tracks concurrently
+            cursor.execute('''
+                SELECT * FROM transfers
+                WHERE (status = 'queued'
+                       OR (status = 'running' AND COALESCE(lease_expires_at, 0) < ?)
+                       OR (status = 'quota_paused' AND ?))
+                  AND NOT EXISTS (
+                      SELECT 1 FROM transfers earlier
+                      WHERE earlier.bulk_id = transfers.bulk_id AND earlier.id < transfers.id
+                        AND earlier.status NOT IN ('completed', 'failed')
+                  )
+                ORDER BY created_at, id LIMIT 1
+            ''', (now, include_paused))
+            result = cursor.fetchone()
+            
+            if not result:
+                conn.rollback()
+                return None
+            
+            cursor.execute('''
+                UPDATE transfers SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (owner, now + lease_seconds, result['id']))
+            conn.commit()
+            
+            transfer = dict(result)
+            transfer.update(status='running', lease_owner=owner, lease_expires_at=now + lease_seconds)
+            return transfer
+    
+    def acquire_transfer_lease(self, transfer_id, owner, lease_seconds):
+        """Lease a transfer unless another owner holds a live lease, returning the fresh row or None"""
+        now = time.time()
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                UPDATE transfers SET lease_owner = ?, lease_expires_at = ?
+                WHERE id = ? AND (lease_owner IS NULL OR lease_owner = ? OR COALESCE(lease_expires_at, 0) < ?)
+            ''', (owner, now + lease_seconds, transfer_id, owner, now))
+            
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return None
+            
+            cursor.execute('SELECT * FROM transfers WHERE id = ?', (transfer_id,))
+            result = cursor.fetchone()
+            conn.commit()
+            return dict(result)
+    
+    def renew_transfer_lease(self, transfer_id, owner, lease_seconds):
+        """Extend a lease (the heartbeat), returning False if it now belongs to someone else"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE transfers SET lease_expires_at = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND lease_owner = ?
+            ''', (time.time() + lease_seconds, transfer_id, owner))
+            conn.commit()
+            return cursor.rowcount > 0
+    
+    def release_transfer_lease(self, transfer_id, owner, status=None):
+        """Give up a lease, optionally setting the transfer's status; a no-op if the lease was lost"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE transfers SET lease_owner = NULL, lease_expires_at = NULL,
+                    status = COALESCE(?, status), updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND lease_owner = ?
+            ''', (status, transfer_id, owner))
+            conn.commit()
+            return cursor.rowcount > 0
+    
+    def count_transfers_by_status(self):
+        """Count transfers per status across all sessions"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT status, COUNT(*) FROM transfers GROUP BY status')
+            return {row[0]: row[1] for row in cursor.fetchall()}
+    
     def get_active_transfer(self, session_id):
-        """Get active transfer for a session"""
+        """Get the newest transfer of a session that has not finished (completed or failed)"""
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM transfers 
-                WHERE session_id = ? AND status != 'completed'
-                ORDER BY created_at DESC LIMIT 1
+                WHERE session_id = ? AND status NOT IN ('completed', 'failed')
+                ORDER BY created_at DESC, id DESC LIMIT 1
             ''', (session_id,))
             result = cursor.fetchone()
             return dict(result) if result else None
@@ -286,38 +1238,176 @@ class DatabaseManager:
                 query = f'UPDATE transfers SET {", ".join(updates)} WHERE id = ?'
                 cursor.execute(query, params)
                 conn.commit()
+                return cursor.rowcount > 0
+            return False
     
-    def add_transfer_result(self, transfer_id, song_db_id, youtube_result=None, status='not_found', added_to_playlist=False):
-        """Add a transfer result"""
+    def add_transfer_results(self, transfer_id, results, processed, successful, failed, status, last_song_id,
+                             lease_owner=None):
+        """Insert a batch of transfer results and update the progress counters in one transaction
+
+        Each result is a (song_db_id, youtube_result, status, added_to_playlist) tuple.
+        Returns False, writing nothing, if the transfer no longer exists or is no longer
+        leased by `lease_owner`.
+        """
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.executemany('''
                 INSERT INTO transfer_results 
-                (transfer_id, song_id, youtube_video_id, youtube_title, youtube_channel, youtube_thumbnail, status, added_to_playlist)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+                (transfer_id, song_id, spotify_id, youtube_video_id, youtube_title, youtube_channel,
+                 youtube_thumbnail, status, added_to_playlist, match_score, match_candidates)
+                VALUES (?, ?, (SELECT spotify_id FROM songs WHERE id = ?), ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
                 transfer_id,
                 song_db_id,
+                song_db_id,
                 youtube_result['video_id'] if youtube_result else None,
                 youtube_result['title'] if youtube_result else None,
                 youtube_result['channel'] if youtube_result else None,
                 youtube_result['thumbnail'] if youtube_result else None,
-                status,
-                added_to_playlist
-            ))
-            conn.commit()
-    
-    def get_transfer_results(self, transfer_id):
-        """Get transfer results"""
+                result_status,
+                added_to_playlist,
+                youtube_result.get('score') if youtube_result else None,
+                json.dumps(youtube_result.get('candidates') or []) if youtube_result else None
+            ) for song_db_id, youtube_result, result_status, added_to_playlist in results])
+            
+            cursor.execute('''
+                UPDATE transfers
+                SET processed = ?, successful = ?, failed = ?, status = ?, last_song_id = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND lease_owner IS ?
+            ''', (processed, successful, failed, status, last_song_id, transfer_id, lease_owner))
+            
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return False
+            
+            # The results now say everything the journal did about these songs
+            cursor.execute(
+                'DELETE FROM transfer_journal WHERE transfer_id = ? AND song_id <= ?',
+                (transfer_id, last_song_id)
+            )
+            
+            conn.commit()
+            return True
+    
+    def get_transfer_journal(self, transfer_id, song_ids):
+        """Get the journal entries of a transfer's songs, keyed by song id"""
+        if not song_ids:
+            return {}
+        
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ', '.join('?' * len(song_ids))
+            cursor.execute(f'''
+                SELECT * FROM transfer_journal WHERE transfer_id = ? AND song_id IN ({placeholders})
+            ''', [transfer_id, *song_ids])
+            
+            return {row['song_id']: {
+                'match': json.loads(row['youtube_match']) if row['youtube_match'] else None,
+                'state': row['state'],
+                'added': None if row['added_to_playlist'] is None else bool(row['added_to_playlist'])
+            } for row in cursor.fetchall()}
+    
+    def journal_transfer_matches(self, transfer_id, matches):
+        """Journal the search results of songs, given as (song_id, youtube_result or None) pairs"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO transfer_journal (transfer_id, song_id, youtube_match) VALUES (?, ?, ?)
+                ON CONFLICT (transfer_id, song_id) DO NOTHING
+            ''', [(
+                transfer_id, song_id, json.dumps(youtube_result) if youtube_result else None
+            ) for song_id, youtube_result in matches])
+            conn.commit()
+    
+    def update_transfer_journal(self, transfer_id, entries):
+        """Move journal entries, given as (song_id, state, added_to_playlist) tuples, to a new state"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE transfer_journal SET state = ?, added_to_playlist = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE transfer_id = ? AND song_id = ?
+            ''', [(state, added, transfer_id, song_id) for song_id, state, added in entries])
+            conn.commit()
+    
+    def get_transfer(self, transfer_id):
+        """Get a transfer by id"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM transfers WHERE id = ?', (transfer_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
+    
+    def get_transfer_result(self, result_id, session_id):
+        """Get a single transfer result with its song and transfer, scoped to a session"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT tr.*, t.playlist_id, t.session_id,
+                       s.spotify_id, c.name AS song_name, c.artist, c.album
+                FROM transfer_results tr
+                JOIN transfers t ON tr.transfer_id = t.id
+                JOIN songs s ON tr.song_id = s.id
+                JOIN tracks c ON c.spotify_id = s.spotify_id
+                WHERE tr.id = ? AND t.session_id = ?
+            ''', (result_id, session_id))
+            result = cursor.fetchone()
+            return dict(result) if result else None
+    
+    def update_transfer_result_match(self, result_id, youtube_result, status, added_to_playlist):
+        """Replace the match of a transfer result and adjust the transfer's counters"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT transfer_id, added_to_playlist FROM transfer_results WHERE id = ?', (result_id,))
+            previous = cursor.fetchone()
+            if not previous:
+                return False
+            
+            cursor.execute('''
+                UPDATE transfer_results
+                SET youtube_video_id = ?, youtube_title = ?, youtube_channel = ?, youtube_thumbnail = ?,
+                    status = ?, added_to_playlist = ?, match_score = ?, match_candidates = ?
+                WHERE id = ?
+            ''', (
+                youtube_result['video_id'],
+                youtube_result['title'],
+                youtube_result['channel'],
+                youtube_result['thumbnail'],
+                status,
+                added_to_playlist,
+                youtube_result.get('score'),
+                json.dumps(youtube_result.get('candidates') or []),
+                result_id
+            ))
+            
+            if added_to_playlist and not previous['added_to_playlist']:
+                cursor.execute('''
+                    UPDATE transfers SET successful = successful + 1, failed = MAX(failed - 1, 0),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (previous['transfer_id'],))
+            elif previous['added_to_playlist'] and not added_to_playlist:
+                cursor.execute('''
+                    UPDATE transfers SET successful = MAX(successful - 1, 0), failed = failed + 1,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (previous['transfer_id'],))
+            
+            conn.commit()
+            return True
+    
+    def get_transfer_results(self, transfer_id, since_id=0):
+        """Get transfer results, optionally only those appended after result id `since_id`"""
         with self.get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT tr.*, s.name as song_name, s.artist, s.album, s.spotify_id
+                SELECT tr.*, t.name as song_name, t.artist, t.album, s.spotify_id
                 FROM transfer_results tr
                 JOIN songs s ON tr.song_id = s.id
-                WHERE tr.transfer_id = ?
+                JOIN tracks t ON t.spotify_id = s.spotify_id
+                WHERE tr.transfer_id = ? AND tr.id > ?
                 ORDER BY tr.id
-            ''', (transfer_id,))
+            ''', (transfer_id, since_id))
             
             results = []
             for row in cursor.fetchall():
@@ -327,10 +1417,12 @@ class DatabaseManager:
                         'video_id': row['youtube_video_id'],
                         'title': row['youtube_title'],
                         'channel': row['youtube_channel'],
-                        'thumbnail': row['youtube_thumbnail']
+                        'thumbnail': row['youtube_thumbnail'],
+                        'score': row['match_score']
                     }
                 
                 results.append({
+                    'id': row['id'],
                     'song': {
                         'id': row['spotify_id'],
                         'name': row['song_name'],
@@ -344,6 +1436,142 @@ class DatabaseManager:
             
             return results
     
+    def charge_quota(self, quota_day, method, units, daily_limit):
+        """Record quota units for a call, refusing (returning False) if it would exceed the daily limit"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT COALESCE(SUM(units), 0) FROM quota_usage WHERE quota_day = ?', (quota_day,))
+            used = cursor.fetchone()[0]
+            
+            if used + units > daily_limit:
+                conn.rollback()
+                return False
+            
+            cursor.execute('''
+                INSERT INTO quota_usage (quota_day, method, calls, units) VALUES (?, ?, 1, ?)
+                ON CONFLICT (quota_day, method) DO UPDATE SET calls = calls + 1, units = units + excluded.units
+            ''', (quota_day, method, units))
+            conn.commit()
+            return True
+    
+    def get_quota_usage(self, quota_day):
+        """Get the quota units used on a given day"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COALESCE(SUM(units), 0) FROM quota_usage WHERE quota_day = ?', (quota_day,))
+            return cursor.fetchone()[0]
+    
+    def exhaust_quota(self, quota_day, daily_limit):
+        """Mark the day's quota as fully spent (the API reported quotaExceeded)"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT COALESCE(SUM(units), 0) FROM quota_usage WHERE quota_day = ?', (quota_day,))
+            used = cursor.fetchone()[0]
+            if used < daily_limit:
+                cursor.execute('''
+                    INSERT INTO quota_usage (quota_day, method, calls, units) VALUES (?, 'external', 0, ?)
+                    ON CONFLICT (quota_day, method) DO UPDATE SET units = units + excluded.units
+                ''', (quota_day, daily_limit - used))
+            conn.commit()
+    
+    def get_cached_match(self, spotify_id, name, artist):
+        """Look up a cached YouTube match by Spotify id, falling back to the normalized query"""
+        keys = [key for key in match_cache_keys(spotify_id, name, artist) if key]
+        
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            for key in keys:
+                cursor.execute('''
+                    SELECT * FROM match_cache
+                    WHERE cache_key = ? AND created_at >= datetime('now', ?)
+                ''', (key, f'-{MATCH_CACHE_TTL_DAYS} days'))
+                result = cursor.fetchone()
+                
+                if result:
+                    cursor.execute(
+                        'UPDATE match_cache SET last_used_at = CURRENT_TIMESTAMP WHERE cache_key = ?',
+                        (key,)
+                    )
+                    conn.commit()
+                    return {
+                        'video_id': result['youtube_video_id'],
+                        'title': result['youtube_title'],
+                        'channel': result['youtube_channel'],
+                        'thumbnail': result['youtube_thumbnail'],
+                        'score': result['match_score'],
+                        'candidates': json.loads(result['match_candidates'] or '[]')
+                    }
+            
+            return None
+    
+    def store_cached_match(self, spotify_id, name, artist, youtube_result):
+        """Cache a chosen YouTube match under the Spotify id and normalized query keys"""
+        keys = [key for key in match_cache_keys(spotify_id, name, artist) if key]
+        
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO match_cache
+                (cache_key, youtube_video_id, youtube_title, youtube_channel, youtube_thumbnail, match_score, match_candidates)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                key,
+                youtube_result['video_id'],
+                youtube_result['title'],
+                youtube_result['channel'],
+                youtube_result['thumbnail'],
+                youtube_result.get('score'),
+                json.dumps(youtube_result.get('candidates') or [])
+            ) for key in keys])
+            conn.commit()
+        
+        with self._match_cache_lock:
+            self._match_cache_inserts += 1
+            prune = self._match_cache_inserts % MATCH_CACHE_PRUNE_INTERVAL == 0
+        if prune:
+            self.prune_match_cache()
+    
+    def count_cached_matches(self, songs):
+        """Count songs that already have a live match cache entry (without touching LRU order)"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cached_keys = set()
+            keys = [key for song in songs for key in match_cache_keys(song['id'], song['name'], song['artist']) if key]
+            
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                cursor.execute(f'''
+                    SELECT cache_key FROM match_cache
+                    WHERE cache_key IN ({", ".join("?" * len(chunk))})
+                      AND created_at >= datetime('now', ?)
+                ''', (*chunk, f'-{MATCH_CACHE_TTL_DAYS} days'))
+                cached_keys.update(row['cache_key'] for row in cursor.fetchall())
+            
+            return sum(
+                1 for song in songs
+                if any(key in cached_keys for key in match_cache_keys(song['id'], song['name'], song['artist']))
+            )
+    
+    def prune_match_cache(self):
+        """Drop expired entries and evict least recently used ones beyond the size bound"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM match_cache WHERE created_at < datetime('now', ?)",
+                (f'-{MATCH_CACHE_TTL_DAYS} days',)
+            )
+            cursor.execute('''
+                DELETE FROM match_cache WHERE cache_key IN (
+                    SELECT cache_key FROM match_cache
+                    ORDER BY last_used_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (MATCH_CACHE_MAX_ENTRIES,))
+            conn.commit()
+    
     def disconnect_service(self, session_id, service):
         """Disconnect a service for a session"""
         with self.get_db_connection() as conn:
@@ -352,7 +1580,8 @@ class DatabaseManager:
             if service == 'spotify':
                 cursor.execute('''
                     UPDATE user_sessions 
-                    SET spotify_token = NULL, spotify_user_id = NULL, updated_at = CURRENT_TIMESTAMP
+                    SET spotify_token = NULL, spotify_user_id = NULL, spotify_profile = NULL,
+                        spotify_profile_fetched_at = NULL, updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 ''', (session_id,))
                 # Also clear songs
@@ -372,6 +1601,7 @@ class DatabaseManager:
             cursor = conn.cursor()
             
             # Delete in correct order due to foreign key constraints
+            cursor.execute('DELETE FROM transfer_journal WHERE transfer_id IN (SELECT id FROM transfers WHERE session_id = ?)', (session_id,))
             cursor.execute('DELETE FROM transfer_results WHERE transfer_id IN (SELECT id FROM transfers WHERE session_id = ?)', (session_id,))
             cursor.execute('DELETE FROM transfers WHERE session_id = ?', (session_id,))
             cursor.execute('DELETE FROM songs WHERE session_id = ?', (session_id,))
@@ -379,9 +1609,509 @@ class DatabaseManager:
             
             conn.commit()
 
+def parse_iso8601_duration(duration):
+    """Convert a YouTube ISO 8601 duration (e.g. PT1H2M3S) into milliseconds"""
+    match = re.fullmatch(r'P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration or '')
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(value or 0) for value in match.groups())
+    return (((days * 24 + hours) * 60 + minutes) * 60 + seconds) * 1000
+
+def score_youtube_candidate(song_name, artist_name, duration_ms, candidate):
+    """Score how well a YouTube candidate matches a Spotify song, from 0 to 1"""
+    song_tokens = set(normalize_match_query(song_name, artist_name).split())
+    title_tokens = set(normalize_match_query(candidate['title'], candidate['channel']).split())
+    name_tokens = set(normalize_match_query(song_name, '').split())
+    
+    # Share of the song's name/artist words found in the video title or channel
+    similarity = len(song_tokens & title_tokens) / len(song_tokens) if song_tokens else 0
+    
+    # Duration closeness; unknown durations score neutral
+    if duration_ms and candidate.get('duration_ms'):
+        difference = abs(duration_ms - candidate['duration_ms'])
+        duration_score = max(0.0, 1 - difference / MATCH_DURATION_TOLERANCE_MS)
+    else:
+        duration_score = 0.5
+    
+    # Auto-generated "Artist - Topic" channels carry the studio recording
+    channel = candidate['channel'] or ''
+    artist_tokens = set(normalize_match_query(artist_name, '').split())
+    channel_tokens = set(normalize_match_query(channel, '').split())
+    if channel.endswith(' - Topic'):
+        channel_score = 1.0
+    elif 'vevo' in channel.lower():
+        channel_score = 0.9
+    elif artist_tokens and artist_tokens <= channel_tokens | {'official'}:
+        channel_score = 0.8
+    else:
+        channel_score = 0.3
+    
+    score = 0.5 * similarity + 0.3 * duration_score + 0.2 * channel_score
+    
+    for word in (title_tokens & MATCH_PENALTY_WORDS) - name_tokens:
+        score *= 0.5
+    
+    return round(score, 4)
+
+def normalize_match_query(name, artist):
+    """Normalize a song name and artist into a stable cache key"""
+    text = f"{name} {artist}".lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+def match_cache_keys(spotify_id, name, artist):
+    """Return the cache keys for a song: its Spotify id and its normalized query"""
+    return (
+        f"spotify:{spotify_id}" if spotify_id else None,
+        f"query:{normalize_match_query(name, artist)}" if name else None
+    )
+
+def mapping_index_keys(spotify_id=None, isrc=None):
+    """Return the mapping index keys for a track: its Spotify id and its ISRC"""
+    keys = []
+    if spotify_id:
+        keys.append(f"spotify:{spotify_id}")
+    if isrc:
+        keys.append(f"isrc:{isrc.strip().upper()}")
+    return [hashlib.blake2b(key.encode('utf-8'), digest_size=MAPPING_INDEX_KEY_SIZE).digest() for key in keys]
+
+def build_mapping_index(mappings, path, chunk_size=1000000):
+    """Compile (spotify_id, isrc, video_id) rows into a sorted, fixed-width index file
+
+    Rows are sorted in chunks that are spilled to temporary files and then merged,
+    so datasets far larger than memory can be compiled. When a key appears more
+    than once the last row wins. The index replaces `path` atomically. Returns the
+    number of records written.
+    """
+    runs = []
+    
+    def spill(chunk):
+        # Sorting on the key alone is stable, so rows keep their input order per key
+        chunk.sort(key=lambda record: record[:MAPPING_INDEX_KEY_SIZE])
+        run = tempfile.TemporaryFile()
+        run.write(b''.join(chunk))
+        run.seek(0)
+        runs.append(run)
+    
+    chunk = []
+    for spotify_id, isrc, video_id in mappings:
+        video = video_id.encode('ascii')
+        if len(video) != MAPPING_INDEX_RECORD_SIZE - MAPPING_INDEX_KEY_SIZE:
+            raise ValueError(f"Invalid YouTube video id: {video_id!r}")
+        for key in mapping_index_keys(spotify_id, isrc):
+            chunk.append(key + video)
+        if len(chunk) >= chunk_size:
+            spill(chunk)
+            chunk = []
+    if chunk:
+        spill(chunk)
+    
+    def read_run(run):
+        while True:
+            record = run.read(MAPPING_INDEX_RECORD_SIZE)
+            if not record:
+                return
+            yield record
+    
+    count = 0
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'wb') as index:
+            index.write(MAPPING_INDEX_HEADER.pack(MAPPING_INDEX_MAGIC, 0))
+            previous = None
+            for record in heapq.merge(*[read_run(run) for run in runs], key=lambda record: record[:MAPPING_INDEX_KEY_SIZE]):
+                if previous is not None and record[:MAPPING_INDEX_KEY_SIZE] != previous[:MAPPING_INDEX_KEY_SIZE]:
+                    index.write(previous)
+                    count += 1
+                previous = record
+            if previous is not None:
+                index.write(previous)
+                count += 1
+            
+            index.seek(0)
+            index.write(MAPPING_INDEX_HEADER.pack(MAPPING_INDEX_MAGIC, count))
+        os.replace(temp_path, path)
+    finally:
+        for run in runs:
+            run.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    
+    return count
+
+class MappingIndex:
+    """Read-only view of the offline mapping index, memory-mapped and binary-searched
+
+    Nothing is loaded into memory: each lookup touches a few pages of the mapped
+    file, which every worker process shares through the OS page cache. A rebuilt
+    index (swapped in by import_mappings.py) is picked up on the next lookup.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        # (file identity, mmap, record count), replaced as a whole when the file changes.
+        # A replaced mmap is never closed explicitly: lookups still holding it keep it
+        # open, and it is unmapped once the last of them lets go.
+        self._state = (None, None, 0)
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        """Return the current (identity, mmap, count), mapping the file again if it changed"""
+        state = self._state
+        try:
+            stat = os.stat(self.path)
+            identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            identity = None
+        
+        if identity == state[0]:
+            return state
+        
+        with self._lock:
+            state = self._state
+            if identity == state[0]:
+                return state
+            
+            mapped, count = None, 0
+            if identity is not None and identity[2] > MAPPING_INDEX_HEADER.size:
+                try:
+                    with open(self.path, 'rb') as f:
+                        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except OSError as e:
+                    # Replaced between stat and open; the next lookup tries again
+                    logger.error(f"Error opening mapping index {self.path}: {e}")
+                    return state
+                
+                magic, count = MAPPING_INDEX_HEADER.unpack_from(mapped)
+                expected_size = MAPPING_INDEX_HEADER.size + count * MAPPING_INDEX_RECORD_SIZE
+                if magic != MAPPING_INDEX_MAGIC or len(mapped) != expected_size:
+                    logger.error(f"{self.path} is not a valid mapping index; ignoring it")
+                    mapped.close()
+                    mapped, count = None, 0
+                else:
+                    logger.info(f"Loaded mapping index {self.path} ({count} keys)")
+            
+            self._state = state = (identity, mapped, count)
+            return state
+    
+    def __len__(self):
+        return self._load()[2]
+    
+    def get(self, spotify_id, isrc=None):
+        """Get the mapped YouTube video id for a track by Spotify id, then ISRC, or None"""
+        _, mapped, count = self._load()
+        if not count:
+            return None
+        
+        for key in mapping_index_keys(spotify_id, isrc):
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                offset = MAPPING_INDEX_HEADER.size + middle * MAPPING_INDEX_RECORD_SIZE
+                if mapped[offset:offset + MAPPING_INDEX_KEY_SIZE] < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            
+            offset = MAPPING_INDEX_HEADER.size + low * MAPPING_INDEX_RECORD_SIZE
+            if low < count and mapped[offset:offset + MAPPING_INDEX_KEY_SIZE] == key:
+                return mapped[offset + MAPPING_INDEX_KEY_SIZE:offset + MAPPING_INDEX_RECORD_SIZE].decode('ascii')
+        
+        return None
+
+mapping_index = MappingIndex(MAPPING_INDEX_FILE)
+
 # Initialize database
 db_manager = DatabaseManager(DATABASE_PATH)
 
+class QuotaExceeded(Exception):
+    """Raised when the daily YouTube quota budget is exhausted"""
+
+class LeaseLost(Exception):
+    """Raised when a transfer's lease expired and another worker or request took it over"""
+
+class UpstreamUnavailable(Exception):
+    """Raised when an API keeps failing with transient errors after every retry
+
+    Playlist inserts attach their per-video `results` so far: True/False for the
+    settled ones, None for those that were not sent or whose outcome is unknown.
+    """
+    
+    def __init__(self, message, results=None):
+        super().__init__(message)
+        self.results = results
+
+class QuotaLedger:
+    """Charges each YouTube API call its unit cost against the daily project budget"""
+    
+    def __init__(self, db_manager, daily_limit=YOUTUBE_DAILY_QUOTA):
+        self.db_manager = db_manager
+        self.daily_limit = daily_limit
+    
+    def quota_day(self):
+        """Current quota day; YouTube resets quotas at midnight Pacific time"""
+        return datetime.now(YOUTUBE_QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+    
+    def next_reset(self):
+        """Time of the next quota reset as an aware datetime"""
+        now = datetime.now(YOUTUBE_QUOTA_TIMEZONE)
+        return datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=YOUTUBE_QUOTA_TIMEZONE)
+    
+    def seconds_until_reset(self):
+        return max(0, (self.next_reset() - datetime.now(YOUTUBE_QUOTA_TIMEZONE)).total_seconds())
+    
+    def used(self):
+        return self.db_manager.get_quota_usage(self.quota_day())
+    
+    def remaining(self):
+        return max(0, self.daily_limit - self.used())
+    
+    def charge(self, method):
+        """Charge a call against today's budget, raising QuotaExceeded if it doesn't fit"""
+        units = YOUTUBE_QUOTA_COSTS[method]
+        if not self.db_manager.charge_quota(self.quota_day(), method, units, self.daily_limit):
+            raise QuotaExceeded(f"Daily YouTube quota exhausted ({method} needs {units} units)")
+        metrics.inc('music_transfer_quota_units_total', units, method=method)
+    
+    def exhaust(self):
+        """Record that YouTube itself rejected a call for quota reasons"""
+        self.db_manager.exhaust_quota(self.quota_day(), self.daily_limit)
+    
+    def summary(self):
+        return {
+            'used': self.used(),
+            'limit': self.daily_limit,
+            'resets_at': self.next_reset().isoformat()
+        }
+    
+    def estimate_transfer(self, total_songs, cached_songs, unique_songs=None, playlists=1, existing_items=None):
+        """Estimate quota units and wall-clock time for a transfer before it starts
+
+        For a bulk transfer `total_songs` counts every playlist entry while only the
+        `unique_songs` need a search. For a sync, `existing_items` (the target
+        playlist's size) are listed and assumed to need no insert.
+        """
+        unique_songs = total_songs if unique_songs is None else unique_songs
+        searches = unique_songs - cached_songs
+        inserts = total_songs
+        list_calls = 0
+        if existing_items is not None:
+            inserts = max(total_songs - existing_items, 0)
+            list_calls = max(1, math.ceil(existing_items / 50))
+        units = (
+            playlists * YOUTUBE_QUOTA_COSTS['playlists.insert']
+            + list_calls * YOUTUBE_QUOTA_COSTS['playlistItems.list']
+            + searches * YOUTUBE_QUOTA_COSTS['search.list']
+            + (searches * YOUTUBE_QUOTA_COSTS['videos.list'] if YOUTUBE_RANK_CANDIDATES else 0)
+            + inserts * YOUTUBE_QUOTA_COSTS['playlistItems.insert']
+        )
+        remaining = self.remaining()
+        
+        days_needed = 0
+        if units > remaining:
+            days_needed = math.ceil((units - remaining) / self.daily_limit)
+        
+        api_calls = playlists + list_calls + searches + inserts
+        seconds = api_calls / YOUTUBE_RATE_LIMIT if YOUTUBE_RATE_LIMIT > 0 else 0
+        if days_needed:
+            seconds += self.seconds_until_reset() + (days_needed - 1) * 86400
+        
+        return {
+            'total_songs': total_songs,
+            'unique_songs': unique_songs,
+            'cached_songs': cached_songs,
+            'searches': searches,
+            'inserts': inserts,
+            'estimated_units': units,
+            'remaining_units_today': remaining,
+            'daily_limit': self.daily_limit,
+            'quota_resets_needed': days_needed,
+            'estimated_seconds': round(seconds)
+        }
+
+def is_quota_error(error):
+    """Check whether an API error is YouTube's quotaExceeded/dailyLimitExceeded"""
+    if not isinstance(error, HttpError) or error.resp.status != 403:
+        return False
+    content = error.content.decode('utf-8', 'ignore') if isinstance(error.content, bytes) else str(error.content)
+    return 'quotaExceeded' in content or 'dailyLimitExceeded' in content
+
+def get_error_reasons(error):
+    """Extract the `errors[].reason` values from a Google API error response"""
+    content = error.content.decode('utf-8', 'ignore') if isinstance(error.content, bytes) else str(error.content)
+    try:
+        return {item.get('reason') for item in json.loads(content)['error'].get('errors', [])}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return set()
+
+def is_connect_error(error):
+    """Check whether a network error happened before the request reached the server"""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, httplib2.ServerNotFoundError, ConnectionRefusedError)):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), (NewConnectionError, ConnectTimeoutError))
+    return False
+
+def is_retryable_error(error, idempotent=True):
+    """Check whether an API error is transient (5xx, 429, rate limits, network failures)
+
+    quotaExceeded, videoNotFound and other client errors are terminal: retrying them
+    only burns quota. A non-idempotent call (an insert) is only retried on network
+    errors that happened while connecting: after a read timeout or a dropped
+    connection the server may already have applied it.
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                          httplib2.ServerNotFoundError, ConnectionError, TimeoutError)):
+        return idempotent or is_connect_error(error)
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        if status == 403:
+            return bool(get_error_reasons(error) & RETRYABLE_ERROR_REASONS)
+        return status in RETRYABLE_YOUTUBE_STATUS_CODES
+    if isinstance(error, SpotifyException):
+        return error.http_status in RETRYABLE_STATUS_CODES
+    return False
+
+def get_retry_after(error):
+    """Read the Retry-After delay (in seconds) from an API error, if the server sent one"""
+    if isinstance(error, HttpError):
+        value = error.resp.get('retry-after')
+    elif isinstance(error, SpotifyException):
+        value = (error.headers or {}).get('Retry-After')
+    else:
+        value = None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class CircuitBreaker:
+    """Pauses calls to an upstream that keeps failing instead of hammering it
+
+    After `failure_threshold` consecutive transient failures the circuit opens and
+    callers wait out `reset_seconds`. The calls after that are trials: a success
+    closes the circuit, another failure re-opens it straight away.
+    """
+    
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_seconds=CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_until = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self):
+        return time.monotonic() < self._opened_until
+    
+    def wait(self):
+        """Block until the circuit lets calls through"""
+        with self._lock:
+            delay = self._opened_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold and not self.is_open:
+                self._opened_until = time.monotonic() + self.reset_seconds
+                logger.warning(f"{self.name} circuit open after {self._failures} failures, pausing for {self.reset_seconds}s")
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient API errors, honoring Retry-After"""
+    
+    def __init__(self, breaker, max_retries=API_MAX_RETRIES, base_delay=API_RETRY_BASE_DELAY, max_delay=API_RETRY_MAX_DELAY):
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def backoff(self, attempt, retry_after=None):
+        """Delay before retry number `attempt` (0-based)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after) if retry_after is not None else delay
+    
+    def call(self, func, idempotent=True):
+        """Call `func`, retrying transient errors; raises UpstreamUnavailable once retries run out
+
+        Transient errors that make a non-idempotent call unsafe to repeat raise
+        UpstreamUnavailable straight away.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.breaker.wait()
+            try:
+                result = func()
+            except Exception as e:
+                if not is_retryable_error(e, idempotent):
+                    if is_retryable_error(e):
+                        self.breaker.record_failure()
+                        raise UpstreamUnavailable(f"{self.breaker.name} call may not have completed: {e}") from e
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise UpstreamUnavailable(f"{self.breaker.name} unavailable: {e}") from e
+                metrics.inc('music_transfer_retries_total', upstream=self.breaker.name)
+                delay = self.backoff(attempt, get_retry_after(e))
+                logger.info(f"Transient {self.breaker.name} error, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+quota_ledger = QuotaLedger(db_manager)
+
+class SharedHTTPSession(requests.Session):
+    """requests.Session shared by every API client for the life of the process
+
+    spotipy closes its session when a client is garbage collected, which would drop
+    the pooled keep-alive connections for everyone else, so close() is a no-op.
+    """
+    
+    def close(self):
+        pass
+
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# Only connection failures are retried here: the request never reached the server, so
+# even POSTs are safe to resend. Status and read retries stay with the callers.
+http_adapter = HTTPAdapter(
+    pool_connections=HTTP_POOL_SIZE,
+    pool_maxsize=HTTP_POOL_SIZE,
+    max_retries=Retry(total=None, connect=HTTP_CONNECT_RETRIES, read=0, status=0, other=0, redirect=5, backoff_factor=0.2)
+)
+http_session = SharedHTTPSession()
+http_session.mount('https://', http_adapter)
+http_session.mount('http://', http_adapter)
+
+class AuthorizedHttpTransport:
+    """Thread-safe httplib2-style transport for googleapiclient over the shared pool"""
+    
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.session = AuthorizedSession(credentials, auth_request=Request(http_session))
+        self.session.mount('https://', http_adapter)
+        self.session.mount('http://', http_adapter)
+    
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        """Send a request and return (httplib2.Response, content) like httplib2.Http"""
+        response = self.session.request(
+            method, uri, data=body, headers=headers,
+            timeout=HTTP_TIMEOUT, allow_redirects=redirections > 0
+        )
+        info = dict(response.headers)
+        info['status'] = str(response.status_code)
+        return httplib2.Response(info), response.content
+    
+    def close(self):
+        # The adapter and its connections belong to the whole process
+        pass
+
 # Initialize Spotify OAuth
 def get_spotify_oauth():
     return SpotifyOAuth(
@@ -389,7 +2119,9 @@ def get_spotify_oauth():
         client_secret=SPOTIFY_CLIENT_SECRET,
         redirect_uri=SPOTIFY_REDIRECT_URI,
         scope=SPOTIFY_SCOPES,
-        cache_path=None
+        cache_path=None,
+        requests_session=http_session,
+        requests_timeout=HTTP_TIMEOUT
     )
 
 # Initialize YouTube OAuth Flow
@@ -413,15 +2145,88 @@ def get_session_id():
         session['session_id'] = str(uuid.uuid4())
     return session['session_id']
 
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket shared by every caller of an API"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens=1):
+        """Block until the requested number of tokens is available"""
+        if self.rate <= 0:
+            return
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+# Shared across all sessions and threads so the whole process stays under the API rate limit
+youtube_rate_limiter = TokenBucketRateLimiter(YOUTUBE_RATE_LIMIT, YOUTUBE_RATE_BURST)
+
+# One breaker per upstream, shared by every session and worker thread
+youtube_retry_policy = RetryPolicy(CircuitBreaker('YouTube'))
+spotify_retry_policy = RetryPolicy(CircuitBreaker('Spotify'), max_retries=SPOTIFY_MAX_RETRIES)
+
+def execute_youtube_request(method, request):
+    """Execute a YouTube API request under the quota ledger, rate limiter and retry policy
+
+    Every attempt is charged, since YouTube bills failed calls too. POSTs (inserts)
+    are not idempotent, so they are not repeated after a read timeout.
+    """
+    def attempt():
+        quota_ledger.charge(method)
+        youtube_rate_limiter.acquire()
+        with instrument('music_transfer_youtube_request_seconds', f"youtube.{method}", method=method):
+            return request.execute()
+    return youtube_retry_policy.call(attempt, idempotent=request.method != 'POST')
+
+@functools.lru_cache(maxsize=None)
+def get_youtube_discovery_document():
+    """Load and parse the bundled YouTube discovery document once per process"""
+    return json.loads(get_static_doc('youtube', 'v3'))
+
+def build_youtube_client(credentials):
+    """Build a YouTube client without re-reading the discovery document"""
+    if YOUTUBE_HTTP_TRANSPORT == 'requests':
+        return build_from_document(get_youtube_discovery_document(), http=AuthorizedHttpTransport(credentials))
+    return build_from_document(get_youtube_discovery_document(), credentials=credentials)
+
 class MusicTransferService:
     def __init__(self):
         self.spotify = None
+        self.spotify_token = None
         self.youtube = None
+        self.youtube_credentials = None
+        self._local = threading.local()
         
-    def set_spotify_client(self, token_info):
-        """Initialize Spotify client with token"""
+    def set_spotify_client(self, token_info, session_id=None):
+        """Initialize Spotify client with token
+
+        With a session_id the client asks the token manager for the access token on
+        every call, so it keeps working after the original token expires.
+        """
         try:
-            self.spotify = spotipy.Spotify(auth=token_info['access_token'])
+            auth_manager = SessionSpotifyAuth(token_manager, session_id) if session_id else None
+            self.spotify = spotipy.Spotify(
+                auth=None if auth_manager else token_info['access_token'],
+                auth_manager=auth_manager,
+                requests_session=http_session,
+                requests_timeout=HTTP_TIMEOUT
+            )
+            self.spotify_token = token_info
             return True
         except Exception as e:
             logger.error(f"Error setting Spotify client: {e}")
@@ -430,148 +2235,1491 @@ class MusicTransferService:
     def set_youtube_client(self, credentials):
         """Initialize YouTube client with credentials"""
         try:
-            self.youtube = build('youtube', 'v3', credentials=credentials)
+            self.youtube = build_youtube_client(credentials)
+            self.youtube_credentials = credentials
+            self._local = threading.local()
+            self._local.youtube = self.youtube
             return True
         except Exception as e:
             logger.error(f"Error setting YouTube client: {e}")
             return False
     
-    def get_spotify_liked_songs(self):
-        """Fetch all liked songs from Spotify"""
+    def _track_to_song(self, item):
+        """Convert a saved-tracks (or playlist-tracks) item into our song dict"""
+        track = item['track']
+        return {
+            'id': track['id'],
+            'name': track['name'],
+            'artist': ', '.join([artist['name'] for artist in track['artists']]),
+            'album': track['album']['name'],
+            'duration_ms': track['duration_ms'],
+            'external_url': track['external_urls']['spotify'],
+            'isrc': track.get('external_ids', {}).get('isrc'),
+            'added_at': item['added_at']
+        }
+    
+    def get_spotify_liked_songs(self, since=None):
+        """Fetch liked songs from Spotify, newest first
+
+        With `since` (an added_at watermark) paging stops at the first already-known
+        track, since the saved-tracks endpoint returns the newest tracks first.
+        """
+        if not self.spotify:
+            raise Exception("Spotify client not initialized")
+        
+        def fetch(request):
+            with instrument('music_transfer_spotify_page_seconds', 'spotify.saved_tracks'):
+                return spotify_retry_policy.call(request)
+        
+        songs = []
+        results = fetch(lambda: self.spotify.current_user_saved_tracks(limit=SPOTIFY_PAGE_SIZE))
+        
+        while results:
+            for item in results['items']:
+                if since and item['added_at'] <= since:
+                    return songs
+                songs.append(self._track_to_song(item))
+            
+            results = fetch(lambda: self.spotify.next(results)) if results['next'] else None
+        
+        return songs
+    
+    def get_spotify_playlists(self):
+        """List the current user's Spotify playlists (owned and followed)"""
+        if not self.spotify:
+            raise Exception("Spotify client not initialized")
+        
+        playlists = []
+        results = spotify_retry_policy.call(lambda: self.spotify.current_user_playlists(limit=50))
+        while results:
+            for playlist in results['items']:
+                playlists.append({
+                    'id': playlist['id'],
+                    'name': playlist['name'],
+                    'owner': playlist['owner'].get('display_name') or playlist['owner']['id'],
+                    'tracks': playlist['tracks']['total']
+                })
+            results = spotify_retry_policy.call(lambda: self.spotify.next(results)) if results['next'] else None
+        
+        return playlists
+    
+    def get_spotify_playlist_tracks(self, playlist_id):
+        """Fetch a Spotify playlist's name and tracks, in playlist order
+
+        Episodes, local files and tracks that are no longer available are skipped.
+        """
         if not self.spotify:
             raise Exception("Spotify client not initialized")
         
+        def fetch(request):
+            with instrument('music_transfer_spotify_page_seconds', 'spotify.playlist_items'):
+                return spotify_retry_policy.call(request)
+        
+        playlist = spotify_retry_policy.call(lambda: self.spotify.playlist(playlist_id, fields='name'))
+        
         songs = []
-        results = self.spotify.current_user_saved_tracks(limit=50)
+        results = fetch(lambda: self.spotify.playlist_items(playlist_id, limit=100, additional_types=('track',)))
+        while results:
+            for item in results['items']:
+                track = item.get('track')
+                if track and track.get('id') and track.get('type', 'track') == 'track':
+                    songs.append(self._track_to_song(item))
+            results = fetch(lambda: self.spotify.next(results)) if results['next'] else None
+        
+        return playlist['name'], songs
+    
+    def _fetch_saved_tracks_page(self, spotify, offset):
+        """Fetch one page of saved tracks, retrying 429/5xx responses per the retry policy"""
+        def fetch():
+            with instrument('music_transfer_spotify_page_seconds', 'spotify.saved_tracks'):
+                return spotify.current_user_saved_tracks(limit=SPOTIFY_PAGE_SIZE, offset=offset)
+        return spotify_retry_policy.call(fetch)
+    
+    def get_spotify_liked_songs_parallel(self, on_page=None, max_workers=SPOTIFY_FETCH_WORKERS):
+        """Fetch all liked songs with concurrent offset-based page requests
+
+        The first page reports the library size; the remaining pages are fetched over a
+        small pool. Pages are handed to `on_page(page, offset)` in library order as soon
+        as every earlier page has arrived, so callers can store them while the rest download.
+        """
+        if not self.spotify:
+            raise Exception("Spotify client not initialized")
+        
+        first_page = self._fetch_saved_tracks_page(self.spotify, 0)
+        pages = {0: [self._track_to_song(item) for item in first_page['items']]}
+        offsets = list(range(SPOTIFY_PAGE_SIZE, first_page['total'], SPOTIFY_PAGE_SIZE))
+        
+        songs = []
+        next_offset = 0
+        
+        def flush():
+            nonlocal next_offset
+            while next_offset in pages:
+                page = pages.pop(next_offset)
+                songs.extend(page)
+                if on_page and page:
+                    on_page(page, next_offset)
+                next_offset += SPOTIFY_PAGE_SIZE
+        
+        flush()
+        if not offsets:
+            return songs
+        
+        def fetch(offset):
+            # The shared session's connection pool is thread-safe, so one client serves every thread
+            results = self._fetch_saved_tracks_page(self.spotify, offset)
+            return offset, [self._track_to_song(item) for item in results['items']]
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='spotify-fetch') as executor:
+            futures = [executor.submit(fetch, offset) for offset in offsets]
+            for future in as_completed(futures):
+                offset, page = future.result()
+                pages[offset] = page
+                flush()
+        
+        return songs
+    
+    def _get_thread_youtube_client(self):
+        """Get a YouTube client safe to use from the current thread
+
+        The pooled transport is thread-safe, so the shared client is returned; with the
+        legacy httplib2 transport each thread gets its own client.
+        """
+        if YOUTUBE_HTTP_TRANSPORT == 'requests':
+            return self.youtube
+        youtube = getattr(self._local, 'youtube', None)
+        if youtube is None:
+            youtube = build_youtube_client(self.youtube_credentials)
+            self._local.youtube = youtube
+        return youtube
+    
+    def search_youtube_video(self, song_name, artist_name, youtube=None, duration_ms=None):
+        """Search for a song on YouTube and return the best-ranked match
+
+        The match carries its score and the runner-up candidates, so a re-match can
+        pick another video without searching again.
+        """
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        youtube = youtube or self._get_thread_youtube_client()
+        query = f"{song_name} {artist_name}"
+        
+        try:
+            search_response = execute_youtube_request('search.list', youtube.search().list(
+                q=query,
+                part='id,snippet',
+                maxResults=YOUTUBE_SEARCH_RESULTS,
+                type='video',
+                videoCategoryId='10'  # Music category
+            ))
+            
+            candidates = [{
+                'video_id': video['id']['videoId'],
+                'title': video['snippet']['title'],
+                'channel': video['snippet']['channelTitle'],
+                'thumbnail': video['snippet']['thumbnails']['default']['url']
+            } for video in search_response['items']]
+            
+            if not candidates:
+                return None
+            if not YOUTUBE_RANK_CANDIDATES:
+                return candidates[0]
+            
+            durations = self._get_video_durations(youtube, [candidate['video_id'] for candidate in candidates])
+            for candidate in candidates:
+                candidate['duration_ms'] = durations.get(candidate['video_id'])
+                candidate['score'] = score_youtube_candidate(song_name, artist_name, duration_ms, candidate)
+            
+            # Stable sort keeps YouTube's relevance order between equal scores
+            candidates.sort(key=lambda candidate: candidate['score'], reverse=True)
+            best = candidates[0]
+            best['candidates'] = candidates[1:]
+            return best
+            
+        except (QuotaExceeded, UpstreamUnavailable):
+            # Not a "not found": the caller pauses and searches this song again later
+            raise
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+                raise QuotaExceeded(str(e))
+            logger.error(f"Error searching YouTube for {query}: {e}")
+            return None
+    
+    def _get_video_durations(self, youtube, video_ids):
+        """Fetch durations for up to 50 videos with a single videos.list call (1 quota unit)"""
+        try:
+            response = execute_youtube_request(
+                'videos.list', youtube.videos().list(part='contentDetails', id=','.join(video_ids))
+            )
+        except (QuotaExceeded, UpstreamUnavailable):
+            # Ranking without durations beats failing a search that is already paid for
+            return {}
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+            else:
+                logger.error(f"Error fetching video details: {e}")
+            return {}
+        
+        return {
+            video['id']: parse_iso8601_duration(video['contentDetails']['duration'])
+            for video in response.get('items', [])
+        }
+    
+    def search_youtube_videos(self, songs, max_workers=YOUTUBE_SEARCH_WORKERS):
+        """Search YouTube for many songs concurrently, returning results in input order"""
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        trace = tracer.snapshot()
+        
+        def search(song):
+            with tracer.attach(trace), tracer.span('youtube.search_song', song_id=song['id']):
+                return self.search_youtube_video(
+                    song['name'], song['artist'], self._get_thread_youtube_client(), song.get('duration_ms')
+                )
+        
+        if max_workers <= 1 or len(songs) <= 1:
+            return [search(song) for song in songs]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(songs)), thread_name_prefix='youtube-search') as executor:
+            return list(executor.map(search, songs))
+    
+    def create_youtube_playlist(self, title, description=""):
+        """Create a new YouTube playlist"""
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        try:
+            playlist_response = execute_youtube_request('playlists.insert', self._get_thread_youtube_client().playlists().insert(
+                part='snippet,status',
+                body={
+                    'snippet': {
+                        'title': title,
+                        'description': description
+                    },
+                    'status': {
+                        'privacyStatus': 'private'
+                    }
+                }
+            ))
+            
+            return playlist_response['id']
+            
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+                raise QuotaExceeded(str(e))
+            logger.error(f"Error creating YouTube playlist: {e}")
+            raise e
+    
+    def add_video_to_playlist(self, playlist_id, video_id):
+        """Add a video to YouTube playlist"""
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        try:
+            execute_youtube_request('playlistItems.insert', self._get_thread_youtube_client().playlistItems().insert(
+                part='snippet',
+                body={
+                    'snippet': {
+                        'playlistId': playlist_id,
+                        'resourceId': {
+                            'kind': 'youtube#video',
+                            'videoId': video_id
+                        }
+                    }
+                }
+            ))
+            return True
+            
+        except (QuotaExceeded, UpstreamUnavailable):
+            raise
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+                raise QuotaExceeded(str(e))
+            logger.error(f"Error adding video {video_id} to playlist {playlist_id}: {e}")
+            return False
+    
+    def get_youtube_playlist(self, playlist_id):
+        """Get a YouTube playlist's title and item count, or None if it does not exist"""
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        try:
+            response = execute_youtube_request('playlists.list', self._get_thread_youtube_client().playlists().list(
+                part='snippet,contentDetails',
+                id=playlist_id,
+                maxResults=1
+            ))
+        except QuotaExceeded:
+            raise
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+                raise QuotaExceeded(str(e))
+            logger.error(f"Error getting YouTube playlist {playlist_id}: {e}")
+            raise e
+        
+        if not response.get('items'):
+            return None
+        
+        playlist = response['items'][0]
+        return {
+            'id': playlist['id'],
+            'title': playlist['snippet']['title'],
+            'item_count': playlist['contentDetails']['itemCount']
+        }
+    
+    def find_youtube_playlist(self, description):
+        """Find one of the user's playlists by its exact description, returning its id or None
+
+        Costs 1 quota unit per 50 playlists listed.
+        """
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        page_token = None
+        while True:
+            try:
+                response = execute_youtube_request('playlists.list', self._get_thread_youtube_client().playlists().list(
+                    part='snippet',
+                    mine=True,
+                    maxResults=50,
+                    pageToken=page_token
+                ))
+            except QuotaExceeded:
+                raise
+            except Exception as e:
+                if is_quota_error(e):
+                    quota_ledger.exhaust()
+                    raise QuotaExceeded(str(e))
+                logger.error(f"Error listing YouTube playlists: {e}")
+                raise e
+            
+            for playlist in response.get('items', []):
+                if playlist['snippet'].get('description') == description:
+                    return playlist['id']
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return None
+    
+    def get_playlist_items(self, playlist_id):
+        """List a playlist's contents as {video_id: [playlist item ids]} (one quota unit per 50 items)"""
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        youtube = self._get_thread_youtube_client()
+        items = {}
+        page_token = None
+        try:
+            while True:
+                response = execute_youtube_request('playlistItems.list', youtube.playlistItems().list(
+                    part='contentDetails',
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=page_token
+                ))
+                for item in response.get('items', []):
+                    items.setdefault(item['contentDetails']['videoId'], []).append(item['id'])
+                
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    return items
+        
+        except QuotaExceeded:
+            raise
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+                raise QuotaExceeded(str(e))
+            logger.error(f"Error listing playlist {playlist_id}: {e}")
+            raise e
+    
+    def remove_playlist_item(self, playlist_item_id):
+        """Remove an item from a playlist, returning False if it could not be removed"""
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        try:
+            execute_youtube_request('playlistItems.delete', self._get_thread_youtube_client().playlistItems().delete(
+                id=playlist_item_id
+            ))
+            return True
+            
+        except QuotaExceeded:
+            raise
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+                raise QuotaExceeded(str(e))
+            logger.error(f"Error removing playlist item {playlist_item_id}: {e}")
+            return False
+    
+    def playlist_contains_video(self, playlist_id, video_id):
+        """Check whether a video is already in a playlist (one quota unit)"""
+        return bool(self.find_playlist_items(playlist_id, video_id))
+    
+    def find_playlist_items(self, playlist_id, video_id):
+        """Get the ids of a playlist's items for one video (one quota unit)"""
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        try:
+            response = execute_youtube_request('playlistItems.list', self._get_thread_youtube_client().playlistItems().list(
+                part='id',
+                playlistId=playlist_id,
+                videoId=video_id,
+                maxResults=50
+            ))
+            return [item['id'] for item in response.get('items', [])]
+            
+        except QuotaExceeded:
+            raise
+        except Exception as e:
+            if is_quota_error(e):
+                quota_ledger.exhaust()
+                raise QuotaExceeded(str(e))
+            logger.error(f"Error checking playlist {playlist_id} for video {video_id}: {e}")
+            raise e
+    
+    def add_videos_to_playlist(self, playlist_id, video_ids, ordered=False):
+        """Add videos to a playlist using HTTP batch requests, returning per-video results in order
+
+        Each result is True/False, or None when the video was not attempted because the
+        quota ran out. Transient failures that outlast the retries raise
+        UpstreamUnavailable instead of being recorded as failed. Videos are appended
+        without explicit positions, which YouTube rejects for playlists that are not
+        sorted manually. YouTube applies the parts of a batch in any order, so with
+        ordered=True the videos are inserted one after another instead.
+        """
+        if not self.youtube:
+            raise Exception("YouTube client not initialized")
+        
+        if ordered or YOUTUBE_BATCH_SIZE <= 1:
+            results = []
+            for video_id in video_ids:
+                try:
+                    results.append(self.add_video_to_playlist(playlist_id, video_id))
+                except QuotaExceeded:
+                    results.extend([None] * (len(video_ids) - len(results)))
+                    break
+                except UpstreamUnavailable as e:
+                    e.results = results + [None] * (len(video_ids) - len(results))
+                    raise
+            return results
+        
+        youtube = self._get_thread_youtube_client()
+        results = [None] * len(video_ids)
+        quota_hit = False
+        pending = list(range(len(video_ids)))
+        
+        # Transient per-item failures are collected and re-sent in later batches with backoff
+        for attempt in range(youtube_retry_policy.max_retries + 1):
+            retry_indices = []
+            retry_after = None
+            
+            def callback(request_id, response, exception):
+                nonlocal quota_hit, retry_after
+                index = int(request_id)
+                if exception is None:
+                    results[index] = True
+                elif is_quota_error(exception):
+                    quota_hit = True
+                elif is_retryable_error(exception):
+                    retry_indices.append(index)
+                    retry_after = get_retry_after(exception) or retry_after
+                else:
+                    logger.error(f"Error adding video {video_ids[index]} to playlist {playlist_id}: {exception}")
+                    results[index] = False
+            
+            for start in range(0, len(pending), YOUTUBE_BATCH_SIZE):
+                youtube_retry_policy.breaker.wait()
+                batch = youtube.new_batch_http_request(callback=callback)
+                indices = []
+                
+                for index in pending[start:start + YOUTUBE_BATCH_SIZE]:
+                    try:
+                        quota_ledger.charge('playlistItems.insert')
+                    except QuotaExceeded:
+                        quota_hit = True
+                        break
+                    youtube_rate_limiter.acquire()
+                    
+                    batch.add(
+                        youtube.playlistItems().insert(part='snippet', body={
+                            'snippet': {
+                                'playlistId': playlist_id,
+                                'resourceId': {
+                                    'kind': 'youtube#video',
+                                    'videoId': video_ids[index]
+                                }
+                            }
+                        }),
+                        request_id=str(index)
+                    )
+                    indices.append(index)
+                
+                if indices:
+                    failed_before = len(retry_indices)
+                    try:
+                        with instrument('music_transfer_youtube_request_seconds', 'youtube.batch', method='batch'):
+                            batch.execute()
+                    except Exception as e:
+                        if is_quota_error(e):
+                            quota_hit = True
+                        elif is_retryable_error(e, idempotent=False):
+                            retry_indices.extend(index for index in indices if results[index] is None)
+                            retry_after = get_retry_after(e) or retry_after
+                        elif is_retryable_error(e):
+                            # The batch may have been applied; resending it could add the videos twice
+                            youtube_retry_policy.breaker.record_failure()
+                            raise UpstreamUnavailable(
+                                f"Playlist batch for {playlist_id} may not have completed: {e}", results
+                            ) from e
+                        else:
+                            logger.error(f"Error executing playlist batch for {playlist_id}: {e}")
+                            for index in indices:
+                                if results[index] is None:
+                                    results[index] = False
+                    
+                    if len(retry_indices) > failed_before:
+                        youtube_retry_policy.breaker.record_failure()
+                    else:
+                        youtube_retry_policy.breaker.record_success()
+                
+                if quota_hit:
+                    break
+            
+            if quota_hit or not retry_indices:
+                break
+            
+            if attempt == youtube_retry_policy.max_retries:
+                raise UpstreamUnavailable(
+                    f"Gave up on {len(retry_indices)} playlist insert(s) for {playlist_id} after {attempt + 1} attempts",
+                    [None if index in retry_indices else result for index, result in enumerate(results)]
+                )
+            
+            metrics.inc('music_transfer_retries_total', len(retry_indices), upstream=youtube_retry_policy.breaker.name)
+            time.sleep(youtube_retry_policy.backoff(attempt, retry_after))
+            pending = sorted(retry_indices)
+        
+        if quota_hit:
+            quota_ledger.exhaust()
+        
+        return results
+
+def build_youtube_credentials(youtube_credentials):
+    """Recreate Google credentials from stored data"""
+    expiry = None
+    if youtube_credentials.get('expiry'):
+        expiry = datetime.fromisoformat(youtube_credentials['expiry'])
+    
+    return Credentials(
+        token=youtube_credentials['token'],
+        refresh_token=youtube_credentials['refresh_token'],
+        token_uri=youtube_credentials['token_uri'],
+        client_id=youtube_credentials['client_id'],
+        client_secret=youtube_credentials['client_secret'],
+        scopes=youtube_credentials['scopes'],
+        expiry=expiry
+    )
+
+class SessionSpotifyAuth:
+    """spotipy auth manager that reads a session's access token from the token manager"""
+    
+    def __init__(self, token_manager, session_id):
+        self.token_manager = token_manager
+        self.session_id = session_id
+    
+    def get_access_token(self, as_dict=False):
+        token_info = self.token_manager.get_spotify_token(self.session_id)
+        return token_info if as_dict else token_info['access_token']
+
+class TokenManager:
+    """Keeps Spotify and YouTube tokens of live sessions fresh ahead of expiry
+
+    A background thread refreshes tokens within `margin` seconds of expiry and writes
+    them back, so API calls rarely wait on a refresh. Concurrent refreshes of the same
+    token are collapsed behind a per-token lock.
+    """
+    
+    def __init__(self, db_manager, margin=TOKEN_REFRESH_MARGIN, interval=TOKEN_REFRESH_INTERVAL):
+        self.db_manager = db_manager
+        self.margin = margin
+        self.interval = interval
+        self._spotify_tokens = {}
+        self._youtube_credentials = {}
+        self._refresh_locks = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def _refresh_lock(self, provider, session_id):
+        with self._lock:
+            return self._refresh_locks.setdefault((provider, session_id), threading.Lock())
+    
+    def track(self, session_id, spotify_token, youtube_credentials):
+        """Track a session's stored tokens, replacing any left from an older connection"""
+        if spotify_token is None:
+            self._spotify_tokens.pop(session_id, None)
+        else:
+            cached = self._spotify_tokens.get(session_id)
+            if cached is None or cached.get('refresh_token') != spotify_token.get('refresh_token'):
+                self._spotify_tokens[session_id] = spotify_token
+        
+        if youtube_credentials is None:
+            self._youtube_credentials.pop(session_id, None)
+        else:
+            cached = self._youtube_credentials.get(session_id)
+            if cached is None or cached.refresh_token != youtube_credentials.get('refresh_token'):
+                self._youtube_credentials[session_id] = build_youtube_credentials(youtube_credentials)
+    
+    def forget(self, session_id):
+        """Stop tracking a session (after disconnecting a service)"""
+        self._spotify_tokens.pop(session_id, None)
+        self._youtube_credentials.pop(session_id, None)
+        with self._lock:
+            self._refresh_locks.pop(('spotify', session_id), None)
+            self._refresh_locks.pop(('youtube', session_id), None)
+    
+    def _spotify_expiring(self, token_info):
+        return 'expires_at' in token_info and token_info['expires_at'] - time.time() < self.margin
+    
+    def _youtube_expiring(self, credentials):
+        if not credentials.refresh_token:
+            return False
+        if credentials.token is None or credentials.expiry is None:
+            return credentials.token is None
+        # google-auth keeps expiry as naive UTC
+        return credentials.expiry - datetime.utcnow() < timedelta(seconds=self.margin)
+    
+    def get_spotify_token(self, session_id):
+        """Get a session's Spotify token info, refreshing it if it is about to expire"""
+        token_info = self._spotify_tokens.get(session_id)
+        if token_info is None:
+            token_info = self.db_manager.get_spotify_token(session_id)
+            if token_info is None:
+                raise Exception("Spotify not connected")
+            self._spotify_tokens[session_id] = token_info
+        
+        if self._spotify_expiring(token_info):
+            token_info = self.refresh_spotify_token(session_id)
+        return token_info
+    
+    def refresh_spotify_token(self, session_id):
+        """Refresh a session's Spotify token unless another thread just did"""
+        with self._refresh_lock('spotify', session_id):
+            token_info = self._spotify_tokens.get(session_id) or self.db_manager.get_spotify_token(session_id)
+            if token_info is None:
+                raise Exception("Spotify not connected")
+            if not self._spotify_expiring(token_info):
+                return token_info
+            
+            token_info = get_spotify_oauth().refresh_access_token(token_info['refresh_token'])
+            self.db_manager.update_spotify_token(session_id, token_info)
+            self._spotify_tokens[session_id] = token_info
+            logger.info(f"Refreshed Spotify token for session {session_id}")
+            return token_info
+    
+    def get_youtube_credentials(self, session_id):
+        """Get a session's shared Google credentials, refreshing them if about to expire"""
+        credentials = self._youtube_credentials.get(session_id)
+        if credentials is None:
+            youtube_credentials = self.db_manager.get_youtube_credentials(session_id)
+            if youtube_credentials is None:
+                raise Exception("YouTube not connected")
+            credentials = self._youtube_credentials.setdefault(
+                session_id, build_youtube_credentials(youtube_credentials)
+            )
+        
+        if self._youtube_expiring(credentials):
+            self.refresh_youtube_credentials(session_id)
+        return credentials
+    
+    def refresh_youtube_credentials(self, session_id):
+        """Refresh a session's Google credentials in place unless another thread just did"""
+        with self._refresh_lock('youtube', session_id):
+            credentials = self._youtube_credentials.get(session_id)
+            if credentials is None or not self._youtube_expiring(credentials):
+                return credentials
+            
+            # Refreshed in place so every client built on these credentials sees the new token
+            credentials.refresh(Request(http_session))
+            youtube_credentials = self.db_manager.get_youtube_credentials(session_id)
+            if youtube_credentials:
+                youtube_credentials['token'] = credentials.token
+                if credentials.expiry:
+                    youtube_credentials['expiry'] = credentials.expiry.isoformat()
+                self.db_manager.update_youtube_credentials(session_id, youtube_credentials)
+            logger.info(f"Refreshed YouTube credentials for session {session_id}")
+            return credentials
+    
+    def refresh_expiring(self):
+        """Refresh every tracked token that expires within the margin"""
+        for session_id, token_info in list(self._spotify_tokens.items()):
+            if self._spotify_expiring(token_info):
+                try:
+                    self.refresh_spotify_token(session_id)
+                except Exception as e:
+                    logger.error(f"Error refreshing Spotify token for session {session_id}: {e}")
+        
+        for session_id, credentials in list(self._youtube_credentials.items()):
+            if self._youtube_expiring(credentials):
+                try:
+                    self.refresh_youtube_credentials(session_id)
+                except Exception as e:
+                    logger.error(f"Error refreshing YouTube credentials for session {session_id}: {e}")
+    
+    def start(self):
+        """Start the background refresh thread (idempotent)"""
+        with self._lock:
+            if self._thread:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='token-refresh', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Signal the refresh thread to stop and wait for it"""
+        self._stop_event.set()
+        with self._lock:
+            if self._thread:
+                self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.refresh_expiring()
+
+token_manager = TokenManager(db_manager)
+if TOKEN_REFRESH_INTERVAL > 0:
+    token_manager.start()
+
+class ClientRegistry:
+    """Per-session cache of built API clients with LRU and TTL eviction
+
+    Entries are rebuilt when a service is reconnected. Services hand each thread its
+    own YouTube client, so a cached service can be shared by concurrent requests.
+    """
+    
+    def __init__(self, max_sessions=CLIENT_CACHE_SIZE, ttl=CLIENT_CACHE_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, session_id):
+        """Get the MusicTransferService for a session, building it if needed"""
+        spotify_token = db_manager.get_spotify_token(session_id)
+        youtube_credentials = db_manager.get_youtube_credentials(session_id)
+        fingerprint = self._fingerprint(spotify_token, youtube_credentials)
+        
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry and entry[1] == fingerprint and time.monotonic() - entry[2] < self.ttl:
+                self._entries.move_to_end(session_id)
+                return entry[0]
+        
+        # Build outside the lock; refreshing credentials does network I/O
+        token_manager.track(session_id, spotify_token, youtube_credentials)
+        service = MusicTransferService()
+        if spotify_token and not service.set_spotify_client(spotify_token, session_id):
+            raise Exception("Failed to initialize Spotify client")
+        if youtube_credentials and not service.set_youtube_client(token_manager.get_youtube_credentials(session_id)):
+            raise Exception("Failed to initialize YouTube client")
+        
+        with self._lock:
+            self._entries[session_id] = (service, fingerprint, time.monotonic())
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                evicted_session_id, _ = self._entries.popitem(last=False)
+                token_manager.forget(evicted_session_id)
+        
+        return service
+    
+    def invalidate(self, session_id):
+        """Drop a session's cached clients (after disconnecting a service)"""
+        with self._lock:
+            self._entries.pop(session_id, None)
+        token_manager.forget(session_id)
+    
+    def _fingerprint(self, spotify_token, youtube_credentials):
+        # Refresh tokens only change on reconnect; access tokens rotate under the token manager
+        return (
+            spotify_token.get('refresh_token') if spotify_token else None,
+            youtube_credentials.get('refresh_token') if youtube_credentials else None
+        )
+
+client_registry = ClientRegistry()
+
+class SpotifyProfileCache:
+    """Spotify profiles cached in the session row and refreshed in the background
+
+    Dashboard renders read the cached profile; a stale one is still shown while a
+    single background refresh per session fetches a new copy.
+    """
+    
+    def __init__(self, db_manager, ttl=SPOTIFY_PROFILE_TTL):
+        self.db_manager = db_manager
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='spotify-profile')
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def get(self, session_id, session_row):
+        """Get the cached profile from a user_sessions row, scheduling a refresh if stale"""
+        profile = json.loads(session_row['spotify_profile']) if session_row.get('spotify_profile') else None
+        if profile is None:
+            # Nothing to show yet (first visit after connecting or upgrading): fetch it now
+            return self.refresh(session_id)
+        
+        fetched_at = session_row.get('spotify_profile_fetched_at') or 0
+        if time.time() - fetched_at >= self.ttl:
+            self.refresh_in_background(session_id)
+        return profile
+    
+    def refresh(self, session_id):
+        """Fetch and store the profile, returning None if Spotify can't be reached"""
+        try:
+            profile = spotify_retry_policy.call(client_registry.get(session_id).spotify.current_user)
+            self.db_manager.update_spotify_profile(session_id, profile)
+            return profile
+        except Exception as e:
+            logger.error(f"Error refreshing Spotify profile for session {session_id}: {e}")
+            return None
+    
+    def refresh_in_background(self, session_id):
+        """Refresh the profile on the executor unless a refresh is already running"""
+        with self._lock:
+            if session_id in self._refreshing:
+                return
+            self._refreshing.add(session_id)
+        
+        def run():
+            try:
+                self.refresh(session_id)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(session_id)
+        
+        self._executor.submit(run)
+
+spotify_profile_cache = SpotifyProfileCache(db_manager)
+
+def get_transfer_service(session_id):
+    """Get the cached MusicTransferService for a session with both services connected"""
+    service = client_registry.get(session_id)
+    if not service.spotify or not service.youtube:
+        raise Exception("Both services must be connected")
+    return service
+
+class TransferResultBuffer:
+    """Write-behind buffer that commits transfer results and progress counters together"""
+    
+    def __init__(self, db_manager, transfer, batch_size=TRANSFER_COMMIT_BATCH_SIZE):
+        self.db_manager = db_manager
+        self.transfer = transfer
+        self.batch_size = max(1, batch_size)
+        self.pending = []
+    
+    def add(self, song_db_id, youtube_result, status, added_to_playlist):
+        self.pending.append((song_db_id, youtube_result, status, added_to_playlist))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Commit buffered results along with the transfer's current counters"""
+        if not self.pending:
+            return
+        
+        transfer = self.transfer
+        if not self.db_manager.add_transfer_results(
+            transfer['id'],
+            self.pending,
+            processed=transfer['processed'],
+            successful=transfer['successful'],
+            failed=transfer['failed'],
+            status=transfer['status'],
+            last_song_id=transfer['last_song_id'],
+            lease_owner=transfer.get('lease_owner')
+        ):
+            raise LeaseLost(f"Transfer {transfer['id']} no longer exists or is leased by someone else")
+        self.pending = []
+
+class TransferJournal:
+    """Journals a transfer's paid API work so a resumed run can replay it instead of repeating it
+
+    Search results are journaled as soon as they arrive, and each playlist insert is
+    journaled as intended before the call and confirmed after it. An insert that was
+    intended but never confirmed (the process died mid-call) is checked against the
+    playlist before it is retried.
+
+    For a sync, `present_videos` holds the video ids already in the playlist; songs
+    matched to one of them are not inserted and are collected in `already_present`.
+    """
+    
+    def __init__(self, db_manager, service, transfer, present_videos=None):
+        self.db_manager = db_manager
+        self.service = service
+        self.transfer = transfer
+        self.present_videos = present_videos
+        self.already_present = set()
+        self.entries = {}
+    
+    def resolve(self, songs):
+        """Get each song's YouTube match, from the journal if an earlier run already searched it"""
+        self.entries.update(self.db_manager.get_transfer_journal(
+            self.transfer['id'], [song['db_id'] for song in songs if song['db_id'] not in self.entries]
+        ))
+        
+        pending = [song for song in songs if song['db_id'] not in self.entries]
+        if pending:
+            searched = search_songs(self.service, pending, self.transfer)
+            self.db_manager.journal_transfer_matches(
+                self.transfer['id'], [(song['db_id'], result) for song, result in zip(pending, searched)]
+            )
+            for song, result in zip(pending, searched):
+                self.entries[song['db_id']] = {'match': result, 'state': 'searched', 'added': None}
+        
+        return [self.entries[song['db_id']]['match'] for song in songs]
+    
+    def insert(self, songs):
+        """Add the resolved songs' videos to the playlist, skipping inserts that already happened
+
+        Returns True/False per song (False when it has no match), or None for songs
+        not attempted because the quota ran out.
+        """
+        playlist_id = self.transfer['playlist_id']
+        added = [False] * len(songs)
+        to_insert = []
         
-        while results:
-            for item in results['items']:
-                track = item['track']
-                songs.append({
-                    'id': track['id'],
-                    'name': track['name'],
-                    'artist': ', '.join([artist['name'] for artist in track['artists']]),
-                    'album': track['album']['name'],
-                    'duration_ms': track['duration_ms'],
-                    'external_url': track['external_urls']['spotify']
-                })
-            
-            if results['next']:
-                results = self.spotify.next(results)
+        for i, song in enumerate(songs):
+            entry = self.entries[song['db_id']]
+            if not entry['match']:
+                continue
+            if entry['state'] == 'inserted':
+                added[i] = entry['added']
+            elif self.present_videos is not None and entry['match']['video_id'] in self.present_videos:
+                self.already_present.add(song['db_id'])
+            elif entry['state'] == 'inserting' and self._already_inserted(song, entry):
+                added[i] = True
             else:
-                break
+                to_insert.append(i)
         
-        return songs
-    
-    def search_youtube_video(self, song_name, artist_name):
-        """Search for a song on YouTube"""
-        if not self.youtube:
-            raise Exception("YouTube client not initialized")
+        if not to_insert:
+            return added
         
-        query = f"{song_name} {artist_name}"
+        self._update([(songs[i]['db_id'], 'inserting', None) for i in to_insert])
         
         try:
-            search_response = self.youtube.search().list(
-                q=query,
-                part='id,snippet',
-                maxResults=5,
-                type='video',
-                videoCategoryId='10'  # Music category
-            ).execute()
-            
-            # Return the best match (first result)
-            if search_response['items']:
-                video = search_response['items'][0]
-                return {
-                    'video_id': video['id']['videoId'],
-                    'title': video['snippet']['title'],
-                    'channel': video['snippet']['channelTitle'],
-                    'thumbnail': video['snippet']['thumbnails']['default']['url']
-                }
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error searching YouTube for {query}: {e}")
-            return None
+            results = self.service.add_videos_to_playlist(
+                playlist_id, [self.entries[songs[i]['db_id']]['match']['video_id'] for i in to_insert],
+                ordered=TRANSFER_ORDERED_INSERTS
+            )
+        except UpstreamUnavailable as e:
+            # Confirm what settled; the rest stay 'inserting' and are checked when the transfer resumes
+            self._update([
+                (songs[i]['db_id'], 'inserted', result)
+                for i, result in zip(to_insert, e.results or []) if result is not None
+            ])
+            raise
+        
+        # Songs skipped for quota go back to 'searched': nothing was sent, so there is nothing to check
+        self._update([
+            (songs[i]['db_id'], 'searched' if result is None else 'inserted', result)
+            for i, result in zip(to_insert, results)
+        ])
+        for i, result in zip(to_insert, results):
+            added[i] = result
+            if result and self.present_videos is not None:
+                # Another song matched to the same video must not add it twice
+                self.present_videos.add(self.entries[songs[i]['db_id']]['match']['video_id'])
+        return added
     
-    def create_youtube_playlist(self, title, description=""):
-        """Create a new YouTube playlist"""
-        if not self.youtube:
-            raise Exception("YouTube client not initialized")
+    def _already_inserted(self, song, entry):
+        """Check an unconfirmed insert against the playlist, confirming it if the video is there"""
+        if not self.service.playlist_contains_video(self.transfer['playlist_id'], entry['match']['video_id']):
+            return False
+        logger.info(f"Transfer {self.transfer['id']}: song {song['db_id']} was already inserted before a restart")
+        self._update([(song['db_id'], 'inserted', True)])
+        return True
+    
+    def _update(self, updates):
+        self.db_manager.update_transfer_journal(self.transfer['id'], updates)
+        for song_id, state, added in updates:
+            self.entries[song_id].update(state=state, added=added)
+
+def get_transfer_cursor(transfer):
+    """Id of the last song a transfer has processed (songs are processed in id order)"""
+    return max(transfer['min_song_id'] or 0, transfer['last_song_id'] or 0)
+
+def get_next_transfer_songs(transfer, limit):
+    """Get the next unprocessed songs of a transfer using its song id cursor"""
+    return db_manager.get_songs(
+        transfer['session_id'],
+        after_id=get_transfer_cursor(transfer),
+        up_to_id=transfer['max_song_id'],
+        limit=limit,
+        source=transfer.get('source') or 'liked'
+    )
+
+class TransferSongIndex:
+    """In-process window of upcoming songs per transfer, so each per-song lookup is O(1)"""
+    
+    def __init__(self, window=TRANSFER_SONG_WINDOW, max_transfers=100):
+        self.window = window
+        self.max_transfers = max_transfers
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def next_song(self, transfer):
+        """Get the next song to process for a transfer, or None when none are left"""
+        cursor = get_transfer_cursor(transfer)
         
+        with self._lock:
+            songs = self._windows.get(transfer['id'])
+            
+            # Drop songs already processed (possibly by another request or process)
+            while songs and songs[0]['db_id'] <= cursor:
+                songs.popleft()
+            
+            if not songs:
+                songs = deque(get_next_transfer_songs(transfer, self.window))
+                self._windows[transfer['id']] = songs
+                while len(self._windows) > self.max_transfers:
+                    self._windows.popitem(last=False)
+            
+            self._windows.move_to_end(transfer['id'])
+            return songs[0] if songs else None
+
+transfer_song_index = TransferSongIndex()
+
+def process_transfer_song(service, transfer, song, total_songs, running_status):
+    """Search, add and record a single song, returning the result and updated progress"""
+    journal = TransferJournal(db_manager, service, transfer)
+    youtube_result = journal.resolve([song])[0]
+    added = journal.insert([song])[0]
+    if added is None:
+        raise QuotaExceeded("Daily YouTube quota exhausted during playlist inserts")
+    return record_transfer_song(transfer, song, youtube_result, total_songs, running_status, added)
+
+def mapped_match(song, video_id):
+    """Build a YouTube match for a song from an offline mapping index entry"""
+    return {
+        'video_id': video_id,
+        'title': song['name'],
+        'channel': song['artist'],
+        'thumbnail': f"https://i.ytimg.com/vi/{video_id}/default.jpg",
+        'score': None,
+        'candidates': []
+    }
+
+def search_songs(service, songs, transfer=None):
+    """Find YouTube matches for songs, consulting the match cache before searching
+
+    Songs of a bulk transfer first reuse whatever an earlier playlist of the same
+    bulk transfer resolved them to, including "not found". Next comes the offline
+    mapping index (by Spotify id, then ISRC), which is trusted over the match cache.
+    """
+    resolved = {}
+    if transfer and transfer.get('bulk_id'):
+        resolved = db_manager.get_bulk_matches(transfer['bulk_id'], [song['id'] for song in songs])
+    
+    mapped = 0
+    for song in songs:
+        if song['id'] not in resolved:
+            video_id = mapping_index.get(song['id'], song.get('isrc'))
+            if video_id:
+                resolved[song['id']] = mapped_match(song, video_id)
+                mapped += 1
+    
+    results = [
+        resolved[song['id']] if song['id'] in resolved
+        else db_manager.get_cached_match(song['id'], song['name'], song['artist'])
+        for song in songs
+    ]
+    misses = [i for i, result in enumerate(results) if result is None and songs[i]['id'] not in resolved]
+    
+    if misses:
+        searched = service.search_youtube_videos([songs[i] for i in misses])
+        for i, youtube_result in zip(misses, searched):
+            results[i] = youtube_result
+            if youtube_result:
+                song = songs[i]
+                db_manager.store_cached_match(song['id'], song['name'], song['artist'], youtube_result)
+    
+    metrics.inc('music_transfer_match_cache_total', mapped, result='mapping')
+    metrics.inc('music_transfer_match_cache_total', len(songs) - len(misses) - mapped, result='hit')
+    metrics.inc('music_transfer_match_cache_total', len(misses), result='miss')
+    logger.debug(f"Match cache: {mapped} mapped, {len(songs) - len(misses) - mapped} hit(s), {len(misses)} miss(es)")
+    return results
+
+def record_transfer_song(transfer, song, youtube_result, total_songs, running_status, added, buffer=None,
+                         already_present=False):
+    """Record an already-searched and inserted song's result and the transfer's progress
+
+    Songs a sync found already in the playlist count as neither added nor failed.
+    """
+    status = 'not_found'
+    added_to_playlist = False
+    
+    if already_present:
+        status = 'already_present'
+    elif youtube_result:
+        status = 'success' if added else 'add_failed'
+        added_to_playlist = added
+    
+    metrics.inc('music_transfer_songs_total', status=status)
+    
+    # Update transfer progress
+    new_processed = transfer['processed'] + 1
+    new_successful = transfer['successful'] + (1 if added_to_playlist else 0)
+    new_failed = transfer['failed'] + (0 if added_to_playlist or already_present else 1)
+    new_status = 'completed' if new_processed >= total_songs else running_status
+    
+    transfer.update(
+        processed=new_processed,
+        successful=new_successful,
+        failed=new_failed,
+        status=new_status,
+        last_song_id=song['db_id']
+    )
+    
+    # Store result and progress together, either now or with the next buffered batch
+    if buffer is None:
+        buffer = TransferResultBuffer(db_manager, transfer, batch_size=1)
+    buffer.add(song['db_id'], youtube_result, status, added_to_playlist)
+    
+    result = {
+        'song': {
+            'id': song['id'],
+            'name': song['name'],
+            'artist': song['artist'],
+            'album': song['album']
+        },
+        'youtube_match': youtube_result,
+        'status': status,
+        'added_to_playlist': added_to_playlist
+    }
+    
+    progress = {
+        'current': new_processed,
+        'total': total_songs,
+        'successful': new_successful,
+        'failed': new_failed,
+        'percentage': (new_processed / total_songs) * 100
+    }
+    
+    return result, progress
+
+# Identifies this process in lease owners, e.g. "host:1234/transfer-worker-0"
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+class TransferLease:
+    """Keeps a claimed transfer's lease alive from a heartbeat thread while it is processed"""
+    
+    def __init__(self, db_manager, transfer, lease_seconds=TRANSFER_LEASE_SECONDS):
+        self.db_manager = db_manager
+        self.transfer = transfer
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{self.transfer['id']}", daemon=True
+        )
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._stop_event.set()
+        self._thread.join()
+    
+    def _run(self):
+        while not self._stop_event.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.db_manager.renew_transfer_lease(
+                    self.transfer['id'], self.transfer['lease_owner'], self.lease_seconds
+                )
+            except Exception as e:
+                logger.error(f"Error renewing lease on transfer {self.transfer['id']}: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost the lease on transfer {self.transfer['id']}")
+                self.lost.set()
+                return
+    
+    def check(self):
+        """Raise LeaseLost if another worker has taken the transfer over"""
+        if self.lost.is_set():
+            raise LeaseLost(f"Lost the lease on transfer {self.transfer['id']}")
+
+class TransferWorker:
+    """Worker pool that drains queued transfers from the database in the background
+
+    Transfers are claimed with a lease that a heartbeat keeps alive, so any number of
+    processes can run workers against one database; a crashed worker's transfer is
+    reclaimed once its lease expires.
+    """
+    
+    def __init__(self, db_manager, num_workers=TRANSFER_WORKERS, poll_interval=TRANSFER_POLL_INTERVAL):
+        self.db_manager = db_manager
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop_event.clear()
+            for i in range(self.num_workers):
+                thread = threading.Thread(target=self._run, name=f'transfer-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logger.info(f"Started {self.num_workers} transfer worker(s)")
+    
+    def stop(self, timeout=None):
+        """Signal the worker threads to stop and wait for them"""
+        self._stop_event.set()
+        with self._lock:
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+    
+    def run_forever(self):
+        """Run the worker pool in the foreground until interrupted"""
+        self.start()
         try:
-            playlist_response = self.youtube.playlists().insert(
-                part='snippet,status',
-                body={
-                    'snippet': {
-                        'title': title,
-                        'description': description
-                    },
-                    'status': {
-                        'privacyStatus': 'private'
-                    }
-                }
-            ).execute()
+            while not self._stop_event.wait(1):
+                pass
+        except KeyboardInterrupt:
+            logger.info("Stopping transfer workers...")
+        finally:
+            self.stop()
+    
+    def _run(self):
+        owner = f"{PROCESS_ID}/{threading.current_thread().name}"
+        while not self._stop_event.is_set():
+            try:
+                # Quota-paused transfers become claimable again once the daily budget resets
+                can_resume = quota_ledger.remaining() >= (
+                    YOUTUBE_QUOTA_COSTS['search.list'] + YOUTUBE_QUOTA_COSTS['playlistItems.insert']
+                )
+                transfer = self.db_manager.claim_next_transfer(owner, TRANSFER_LEASE_SECONDS, include_paused=can_resume)
+            except Exception as e:
+                logger.error(f"Error claiming transfer: {e}")
+                transfer = None
             
-            return playlist_response['id']
+            if not transfer:
+                self._stop_event.wait(self.poll_interval)
+                continue
             
-        except Exception as e:
-            logger.error(f"Error creating YouTube playlist: {e}")
-            raise e
+            status = None
+            try:
+                self.run_transfer(transfer)
+                if transfer['status'] != 'completed':
+                    # Stopped mid-run: hand it straight back instead of waiting for the lease to expire
+                    status = 'queued'
+            except LeaseLost as e:
+                logger.warning(f"Abandoning transfer {transfer['id']}: {e}")
+                continue
+            except QuotaExceeded as e:
+                logger.info(f"Pausing transfer {transfer['id']} until the quota resets: {e}")
+                status = 'quota_paused'
+            except UpstreamUnavailable as e:
+                # Requeued; the open circuit breaker holds the next attempt until the API recovers
+                logger.warning(f"Requeueing transfer {transfer['id']}: {e}")
+                status = 'queued'
+            except Exception as e:
+                logger.error(f"Error running transfer {transfer['id']}: {e}")
+                status = 'failed'
+            
+            try:
+                self.db_manager.release_transfer_lease(transfer['id'], owner, status)
+            except Exception as e:
+                logger.error(f"Error releasing transfer {transfer['id']}: {e}")
     
-    def add_video_to_playlist(self, playlist_id, video_id):
-        """Add a video to YouTube playlist"""
-        if not self.youtube:
-            raise Exception("YouTube client not initialized")
+    def run_transfer(self, transfer):
+        """Process every remaining song of a claimed transfer while holding its lease"""
+        with tracer.span('transfer.run', transfer_id=transfer['id']), TransferLease(self.db_manager, transfer) as lease:
+            service = get_transfer_service(transfer['session_id'])
+            
+            if not transfer['playlist_id']:
+                # Bulk transfers create their YouTube playlist when they start, after the quota check.
+                # The description names the transfer, so a run that died before recording the new
+                # playlist's id finds it again instead of creating a second one.
+                description = f"Playlist created from Spotify using Music Transfer App (transfer {transfer['id']})"
+                playlist_id = None
+                if transfer['playlist_requested']:
+                    playlist_id = service.find_youtube_playlist(description)
+                if not playlist_id:
+                    self.db_manager.mark_transfer_playlist_requested(transfer['id'])
+                    playlist_id = service.create_youtube_playlist(transfer['playlist_name'], description)
+                transfer['playlist_id'] = playlist_id
+                self.db_manager.set_transfer_playlist(transfer['id'], playlist_id)
+            
+            present_videos = None
+            if transfer['sync']:
+                # Listed on every (re)start, so the diff reflects whatever is in the playlist now
+                playlist_items = service.get_playlist_items(transfer['playlist_id'])
+                if transfer['remove_missing']:
+                    self._remove_unliked(service, transfer, playlist_items)
+                present_videos = set(playlist_items)
+            
+            buffer = TransferResultBuffer(self.db_manager, transfer)
+            journal = TransferJournal(self.db_manager, service, transfer, present_videos)
+            try:
+                self._run_batches(service, transfer, buffer, lease, journal)
+            finally:
+                if not lease.lost.is_set():
+                    buffer.flush()
+    
+    def _remove_unliked(self, service, transfer, playlist_items):
+        """Remove videos this app added for songs that have since been un-liked"""
+        removed = 0
+        unliked = self.db_manager.get_unliked_playlist_videos(
+            transfer['session_id'], transfer['playlist_id'], transfer['source']
+        )
+        for video_id in unliked:
+            for playlist_item_id in playlist_items.pop(video_id, []):
+                if service.remove_playlist_item(playlist_item_id):
+                    removed += 1
         
-        try:
-            self.youtube.playlistItems().insert(
-                part='snippet',
-                body={
-                    'snippet': {
-                        'playlistId': playlist_id,
-                        'resourceId': {
-                            'kind': 'youtube#video',
-                            'videoId': video_id
-                        }
-                    }
-                }
-            ).execute()
-            return True
+        if removed:
+            logger.info(f"Transfer {transfer['id']}: removed {removed} un-liked video(s) from the playlist")
+            self.db_manager.add_transfer_removed(transfer['id'], removed)
+    
+    def _run_batches(self, service, transfer, buffer, lease, journal):
+        # Search a batch of songs concurrently, then insert them in library order
+        while transfer['status'] != 'completed':
+            if self._stop_event.is_set():
+                return
+            lease.check()
             
-        except Exception as e:
-            logger.error(f"Error adding video {video_id} to playlist {playlist_id}: {e}")
-            return False
+            if transfer['follows_fetch']:
+                # Started while the songs were still being fetched: take whatever pages were
+                # stored since, and close the song range once the fetch is done
+                transfer.update(self.db_manager.refresh_followed_transfer(
+                    transfer, finished=not self.db_manager.is_fetching_songs(transfer['session_id'])
+                ))
+            # The transfer cannot complete before the fetch has stored every song
+            total_songs = float('inf') if transfer['follows_fetch'] else transfer['total_songs']
+            
+            batch = get_next_transfer_songs(transfer, TRANSFER_SEARCH_BATCH_SIZE)
+            if not batch and transfer['follows_fetch']:
+                buffer.flush()
+                self._stop_event.wait(TRANSFER_POLL_INTERVAL)
+                continue
+            if not batch:
+                # Songs were removed from the library mid-transfer; nothing is left to do
+                buffer.flush()
+                self.db_manager.update_transfer_progress(transfer['id'], status='completed')
+                transfer['status'] = 'completed'
+                return
+            
+            youtube_results = journal.resolve(batch)
+            # Searches can take a while; make sure nobody else took over before inserting
+            lease.check()
+            
+            # Append the batch's matches, one at a time to keep library order; a sync appends what is missing
+            added_results = journal.insert(batch)
+            
+            for song, youtube_result, added in zip(batch, youtube_results, added_results):
+                if added is None:
+                    raise QuotaExceeded("Daily YouTube quota exhausted during playlist inserts")
+                record_transfer_song(
+                    transfer, song, youtube_result, total_songs, 'running', added, buffer=buffer,
+                    already_present=song['db_id'] in journal.already_present
+                )
+
+def count_transfers(*statuses):
+    counts = db_manager.count_transfers_by_status()
+    return sum(counts.get(status, 0) for status in statuses)
+
+metrics.gauge('music_transfer_active_transfers', lambda: count_transfers('running', 'processing'))
+metrics.gauge('music_transfer_queue_depth', lambda: count_transfers('queued', 'quota_paused'))
+
+# Initialize background transfer workers
+transfer_worker = TransferWorker(db_manager)
+if TRANSFER_WORKER_MODE == 'thread' and TRANSFER_WORKERS > 0:
+    transfer_worker.start()
 
-# Initialize service
-transfer_service = MusicTransferService()
+# Only one cProfile profiler can be active per process (enforced from Python 3.12)
+profile_lock = threading.Lock()
+
+@app.before_request
+def start_request_instrumentation():
+    """Open the request's trace span and start the profiler when asked to"""
+    if tracer.enabled:
+        g.trace_span = tracer.span('request', method=request.method, path=request.path)
+        g.trace_span.__enter__()
+    
+    # A request that arrives while another one is being profiled is served unprofiled
+    if request.endpoint in PROFILED_ENDPOINTS and (
+        PROFILE_REQUESTS == 'always' or (PROFILE_REQUESTS == 'header' and request.headers.get('X-Profile') == '1')
+    ) and profile_lock.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_request_profile(response):
+    """Dump the request's cProfile stats (view with `python -m pstats <file>`)"""
+    profiler = g.pop('profiler', None)
+    if profiler:
+        profiler.disable()
+        profile_lock.release()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{request.endpoint}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.pstats")
+        profiler.dump_stats(path)
+        response.headers['X-Profile-Dump'] = os.path.basename(path)
+    tracer.annotate(status=response.status_code)
+    return response
+
+@app.teardown_request
+def finish_request_span(error):
+    profiler = g.pop('profiler', None)
+    if profiler:
+        # The response was never finalized, so after_request did not stop the profiler
+        profiler.disable()
+        profile_lock.release()
+    
+    span = g.pop('trace_span', None)
+    if span:
+        span.__exit__(type(error) if error else None, error, None)
 
 @app.route('/')
 def index():
     """Main page"""
     session_id = get_session_id()
-    db_manager.get_or_create_session(session_id)
-    
-    spotify_token = db_manager.get_spotify_token(session_id)
-    youtube_credentials = db_manager.get_youtube_credentials(session_id)
+    session_row = db_manager.get_or_create_session(session_id)
     
-    spotify_connected = spotify_token is not None
-    youtube_connected = youtube_credentials is not None
+    spotify_connected = session_row['spotify_token'] is not None
+    youtube_connected = session_row['youtube_credentials'] is not None
     
-    spotify_user = None
-    if spotify_connected:
-        try:
-            transfer_service.set_spotify_client(spotify_token)
-            spotify_user = transfer_service.spotify.current_user()
-        except:
-            spotify_connected = False
-            db_manager.disconnect_service(session_id, 'spotify')
+    # Served from the session row; a failed refresh keeps showing the cached profile
+    spotify_user = spotify_profile_cache.get(session_id, session_row) if spotify_connected else None
     
     return render_template('index.html', 
                          spotify_connected=spotify_connected,
                          youtube_connected=youtube_connected,
                          spotify_user=spotify_user)
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics for this process"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/connect/spotify')
 def connect_spotify():
     """Initiate Spotify OAuth"""
@@ -597,10 +3745,12 @@ def spotify_callback():
         token_info = spotify_oauth.get_access_token(code)
         
         # Get user info
-        transfer_service.set_spotify_client(token_info)
-        user_info = transfer_service.spotify.current_user()
+        spotify_client = MusicTransferService()
+        spotify_client.set_spotify_client(token_info)
+        user_info = spotify_retry_policy.call(spotify_client.spotify.current_user)
         
         db_manager.update_spotify_token(session_id, token_info, user_info['id'])
+        db_manager.update_spotify_profile(session_id, user_info)
         flash('Successfully connected to Spotify!', 'success')
     except Exception as e:
         logger.error(f"Spotify callback error: {e}")
@@ -674,15 +3824,36 @@ def fetch_songs():
         return jsonify({'error': 'Spotify not connected'}), 401
     
     try:
-        if not transfer_service.set_spotify_client(spotify_token):
-            return jsonify({'error': 'Failed to initialize Spotify client'}), 500
+        transfer_service = client_registry.get(session_id)
         
-        songs = transfer_service.get_spotify_liked_songs()
-        db_manager.store_songs(session_id, songs)
+        # mode=delta only pages until it reaches tracks we already have
+        watermark = db_manager.get_songs_watermark(session_id) if request.args.get('mode') == 'delta' else None
+        
+        if watermark:
+            songs = transfer_service.get_spotify_liked_songs(since=watermark)
+            db_manager.store_songs(session_id, songs, replace=False, prepend=True)
+        elif SPOTIFY_FETCH_WORKERS > 1:
+            # Store each page as it arrives; a transfer started meanwhile follows the fetch
+            # and picks up the pages stored after it started
+            def store_page(page, offset):
+                db_manager.store_songs(session_id, page, replace=False, start_position=offset)
+                db_manager.mark_songs_fetch(session_id)
+            
+            db_manager.mark_songs_fetch(session_id)
+            try:
+                songs = transfer_service.get_spotify_liked_songs_parallel(on_page=store_page)
+                db_manager.remove_songs_not_in(session_id, [song['id'] for song in songs])
+            finally:
+                db_manager.mark_songs_fetch(session_id, in_progress=False)
+        else:
+            songs = transfer_service.get_spotify_liked_songs()
+            db_manager.store_songs(session_id, songs)
         
         return jsonify({
             'success': True,
-            'count': len(songs),
+            'mode': 'delta' if watermark else 'full',
+            'count': db_manager.count_songs(session_id),
+            'new_count': len(songs),
             'songs': songs
         })
         
@@ -690,6 +3861,15 @@ def fetch_songs():
         logger.error(f"Error fetching songs: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/fetch-songs/status')
+def fetch_songs_status():
+    """API endpoint reporting how many songs a fetch in progress has stored so far"""
+    session_id = get_session_id()
+    return jsonify({
+        'fetching': db_manager.is_fetching_songs(session_id),
+        'count': db_manager.count_songs(session_id)
+    })
+
 @app.route('/api/transfer', methods=['POST'])
 def start_transfer():
     """API endpoint to start the transfer process"""
@@ -700,185 +3880,468 @@ def start_transfer():
     if not spotify_token or not youtube_credentials:
         return jsonify({'error': 'Both services must be connected'}), 401
     
-    songs = db_manager.get_songs(session_id)
+    data = request.get_json() or {}
+    
+    # mode=incremental pushes only songs fetched since the previous transfer into its playlist;
+    # mode=sync diffs the whole library against an existing playlist
+    previous = None
+    min_song_id = 0
+    sync = data.get('mode') == 'sync'
+    if sync:
+        if not data.get('playlist_id'):
+            return jsonify({'error': 'playlist_id is required to sync'}), 400
+        if TRANSFER_WORKER_MODE == 'off':
+            return jsonify({'error': 'Syncing needs background workers (TRANSFER_WORKER_MODE)'}), 400
+    elif data.get('mode') == 'incremental':
+        # Bulk playlist transfers have their own playlists and song cursors
+        previous = db_manager.get_latest_transfer(session_id, source='liked', include_bulk=False)
+        if not previous or not previous['playlist_id']:
+            return jsonify({'error': 'No previous transfer to continue'}), 400
+        min_song_id = db_manager.get_transfer_song_range_end(previous)
+    
+    # A background transfer started while the songs are still being fetched follows the fetch
+    following = TRANSFER_WORKER_MODE != 'off' and db_manager.is_fetching_songs(session_id)
+    if following and sync:
+        return jsonify({'error': 'Songs are still being fetched; sync once the fetch is done',
+                        'retry_after': TRANSFER_POLL_INTERVAL}), 409
+    
+    songs = db_manager.get_songs(session_id, after_id=min_song_id)
     if not songs:
+        if following:
+            return jsonify({'error': 'No songs fetched yet, try again in a moment',
+                            'retry_after': TRANSFER_POLL_INTERVAL}), 409
+        if previous:
+            return jsonify({'error': 'No new songs since the last transfer'}), 400
         return jsonify({'error': 'No songs fetched. Please fetch songs first.'}), 400
     
     try:
-        # Initialize clients
-        transfer_service.set_spotify_client(spotify_token)
-        
-        # Recreate YouTube credentials
-        expiry = None
-        if youtube_credentials.get('expiry'):
-            expiry = datetime.fromisoformat(youtube_credentials['expiry'])
-        
-        credentials = Credentials(
-            token=youtube_credentials['token'],
-            refresh_token=youtube_credentials['refresh_token'],
-            token_uri=youtube_credentials['token_uri'],
-            client_id=youtube_credentials['client_id'],
-            client_secret=youtube_credentials['client_secret'],
-            scopes=youtube_credentials['scopes'],
-            expiry=expiry
-        )
+        transfer_service = get_transfer_service(session_id)
         
-        # Refresh token if needed
-        if credentials.expired and credentials.refresh_token:
-            credentials.refresh(Request())
-            # Update database with new token
-            youtube_credentials['token'] = credentials.token
-            if credentials.expiry:
-                youtube_credentials['expiry'] = credentials.expiry.isoformat()
-            db_manager.update_youtube_credentials(session_id, youtube_credentials)
-        
-        transfer_service.set_youtube_client(credentials)
-        
-        # Get playlist name from request
-        data = request.get_json()
-        playlist_name = data.get('playlist_name', f"Spotify Liked Songs - {datetime.now().strftime('%Y-%m-%d')}")
-        
-        # Create YouTube playlist
-        playlist_id = transfer_service.create_youtube_playlist(
-            playlist_name,
-            "Playlist created from Spotify liked songs using Music Transfer App"
+        sync_playlist = None
+        if sync:
+            sync_playlist = transfer_service.get_youtube_playlist(data['playlist_id'])
+            if not sync_playlist:
+                return jsonify({'error': 'YouTube playlist not found'}), 404
+        
+        estimate = quota_ledger.estimate_transfer(
+            len(songs), db_manager.count_cached_matches(songs),
+            playlists=0 if previous or sync_playlist else 1,
+            existing_items=sync_playlist['item_count'] if sync_playlist else None
         )
+        if data.get('dry_run'):
+            return jsonify({
+                'success': True,
+                'dry_run': True,
+                'estimate': estimate
+            })
+        
+        if sync_playlist:
+            playlist_id = sync_playlist['id']
+            playlist_name = sync_playlist['title']
+        elif previous:
+            playlist_id = previous['playlist_id']
+            playlist_name = previous['playlist_name']
+        else:
+            playlist_name = data.get('playlist_name', f"Spotify Liked Songs - {datetime.now().strftime('%Y-%m-%d')}")
+            
+            # Create YouTube playlist
+            playlist_id = transfer_service.create_youtube_playlist(
+                playlist_name,
+                "Playlist created from Spotify liked songs using Music Transfer App"
+            )
         
-        # Store transfer in database
-        transfer_id = db_manager.create_transfer(session_id, playlist_id, playlist_name, len(songs))
+        # Store transfer in database; background transfers are picked up by the worker pool
+        background = TRANSFER_WORKER_MODE != 'off'
+        transfer_id = db_manager.create_transfer(
+            session_id, playlist_id, playlist_name, len(songs),
+            status='queued' if background else 'pending',
+            min_song_id=min_song_id,
+            max_song_id=None if following else songs[-1]['db_id'],
+            sync=sync,
+            remove_missing=sync and bool(data.get('remove_missing')),
+            follows_fetch=following
+        )
         
         return jsonify({
             'success': True,
             'playlist_id': playlist_id,
             'playlist_name': playlist_name,
-            'transfer_id': transfer_id
+            'transfer_id': transfer_id,
+            'background': background,
+            'follows_fetch': following,
+            'estimate': estimate
         })
         
+    except QuotaExceeded as e:
+        return jsonify({'error': str(e), 'quota': quota_ledger.summary()}), 429
     except Exception as e:
         logger.error(f"Error starting transfer: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/transfer/process', methods=['POST'])
-def process_transfer():
-    """API endpoint to process individual songs"""
+@app.route('/api/spotify/playlists')
+def spotify_playlists():
+    """API endpoint to list the user's Spotify playlists"""
     session_id = get_session_id()
-    transfer = db_manager.get_active_transfer(session_id)
     
-    if not transfer:
-        return jsonify({'error': 'Transfer not initialized'}), 400
+    if not db_manager.get_spotify_token(session_id):
+        return jsonify({'error': 'Spotify not connected'}), 401
     
-    songs = db_manager.get_songs(session_id)
-    if not songs:
-        return jsonify({'error': 'No songs found'}), 400
+    try:
+        return jsonify({'playlists': client_registry.get(session_id).get_spotify_playlists()})
+    except Exception as e:
+        logger.error(f"Error fetching playlists: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/transfer/bulk', methods=['POST'])
+def start_bulk_transfer():
+    """API endpoint to transfer several Spotify playlists (and optionally liked songs) at once
+
+    Every source gets its own YouTube playlist, but each distinct track is searched
+    only once: the playlists run one after another and reuse earlier matches.
+    """
+    session_id = get_session_id()
+    spotify_token = db_manager.get_spotify_token(session_id)
+    youtube_credentials = db_manager.get_youtube_credentials(session_id)
+    
+    if not spotify_token or not youtube_credentials:
+        return jsonify({'error': 'Both services must be connected'}), 401
+    
+    if TRANSFER_WORKER_MODE == 'off':
+        return jsonify({'error': 'Bulk transfers need background workers (TRANSFER_WORKER_MODE)'}), 400
+    
+    data = request.get_json() or {}
+    playlist_ids = list(dict.fromkeys(data.get('playlists') or []))
+    
+    if not playlist_ids and not data.get('include_liked'):
+        return jsonify({'error': 'Choose at least one playlist'}), 400
     
     try:
-        current_index = transfer['processed']
+        transfer_service = get_transfer_service(session_id)
         
-        if current_index >= len(songs):
-            return jsonify({'error': 'All songs processed'}), 400
+        # (source, YouTube playlist name, songs) for every non-empty source
+        sources = []
+        if data.get('include_liked'):
+            songs = db_manager.get_songs(session_id)
+            if not songs:
+                return jsonify({'error': 'No songs fetched. Please fetch songs first.'}), 400
+            sources.append(('liked', f"Spotify Liked Songs - {datetime.now().strftime('%Y-%m-%d')}", songs))
         
-        song = songs[current_index]
+        for playlist_id in playlist_ids:
+            name, fetched = transfer_service.get_spotify_playlist_tracks(playlist_id)
+            db_manager.store_songs(session_id, fetched, source=playlist_id)
+            songs = db_manager.get_songs(session_id, source=playlist_id)
+            if songs:
+                sources.append((playlist_id, name, songs))
         
-        # Search for the song on YouTube
-        youtube_result = transfer_service.search_youtube_video(song['name'], song['artist'])
+        if not sources:
+            return jsonify({'error': 'The selected playlists are empty'}), 400
         
-        status = 'not_found'
-        added_to_playlist = False
+        unique_songs = list({song['id']: song for _, _, songs in sources for song in songs}.values())
+        estimate = quota_ledger.estimate_transfer(
+            sum(len(songs) for _, _, songs in sources),
+            db_manager.count_cached_matches(unique_songs),
+            unique_songs=len(unique_songs),
+            playlists=len(sources)
+        )
+        summary = [{'source': source, 'name': name, 'songs': len(songs)} for source, name, songs in sources]
         
-        if youtube_result:
-            # Try to add to playlist
-            success = transfer_service.add_video_to_playlist(
-                transfer['playlist_id'],
-                youtube_result['video_id']
-            )
-            
-            if success:
-                status = 'success'
-                added_to_playlist = True
-            else:
-                status = 'add_failed'
+        if data.get('dry_run'):
+            return jsonify({
+                'success': True,
+                'dry_run': True,
+                'sources': summary,
+                'estimate': estimate
+            })
         
-        # Store result in database
-        db_manager.add_transfer_result(
-            transfer['id'],
-            song['db_id'],
-            youtube_result,
-            status,
-            added_to_playlist
-        )
+        bulk_id, transfer_ids = db_manager.create_bulk_transfer(session_id, [{
+            'source': source,
+            'playlist_name': name,
+            'total_songs': len(songs),
+            'max_song_id': songs[-1]['db_id']
+        } for source, name, songs in sources])
         
-        # Update transfer progress
-        new_processed = current_index + 1
-        new_successful = transfer['successful'] + (1 if added_to_playlist else 0)
-        new_failed = transfer['failed'] + (0 if added_to_playlist else 1)
-        new_status = 'completed' if new_processed >= len(songs) else 'processing'
+        return jsonify({
+            'success': True,
+            'bulk_id': bulk_id,
+            'transfers': [dict(item, transfer_id=transfer_id) for item, transfer_id in zip(summary, transfer_ids)],
+            'estimate': estimate
+        })
         
-        db_manager.update_transfer_progress(
-            transfer['id'],
-            processed=new_processed,
-            successful=new_successful,
-            failed=new_failed,
-            status=new_status
-        )
+    except QuotaExceeded as e:
+        return jsonify({'error': str(e), 'quota': quota_ledger.summary()}), 429
+    except Exception as e:
+        logger.error(f"Error starting bulk transfer: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/transfer/bulk/<int:bulk_id>')
+def bulk_transfer_status(bulk_id):
+    """Get the progress of every playlist in a bulk transfer"""
+    session_id = get_session_id()
+    transfers = db_manager.get_bulk_transfers(bulk_id, session_id)
+    
+    if not transfers:
+        return jsonify({'error': 'Bulk transfer not found'}), 404
+    
+    return jsonify({
+        'bulk_id': bulk_id,
+        'transfers': [{
+            'transfer_id': transfer['id'],
+            'source': transfer['source'],
+            'playlist_id': transfer['playlist_id'],
+            'playlist_name': transfer['playlist_name'],
+            'status': transfer['status'],
+            'progress': build_transfer_progress(transfer)
+        } for transfer in transfers],
+        'completed': all(transfer['status'] in ('completed', 'failed') for transfer in transfers),
+        'quota': quota_ledger.summary()
+    })
+
+@app.route('/api/transfer/process', methods=['POST'])
+def process_transfer():
+    """API endpoint to process individual songs"""
+    session_id = get_session_id()
+    transfer = db_manager.get_active_transfer(session_id)
+    
+    if not transfer:
+        return jsonify({'error': 'Transfer not initialized'}), 400
+    
+    if transfer['status'] in ('queued', 'running'):
+        return jsonify({'error': 'Transfer is being processed in the background'}), 409
+    
+    # A short lease keeps two requests (or two app processes) from recording the same song twice
+    owner = f"{PROCESS_ID}/request-{uuid.uuid4().hex[:8]}"
+    transfer = db_manager.acquire_transfer_lease(transfer['id'], owner, TRANSFER_LEASE_SECONDS)
+    if not transfer:
+        return jsonify({'error': 'Another request is processing this transfer', 'retry_after': 1}), 409
+    
+    total_songs = transfer['total_songs']
+    
+    try:
+        song = transfer_song_index.next_song(transfer)
         
-        result = {
-            'song': {
-                'id': song['id'],
-                'name': song['name'],
-                'artist': song['artist'],
-                'album': song['album']
-            },
-            'youtube_match': youtube_result,
-            'status': status,
-            'added_to_playlist': added_to_playlist
-        }
+        if song is None or transfer['processed'] >= total_songs:
+            if transfer['processed'] < total_songs:
+                # Songs were removed from the library mid-transfer
+                db_manager.update_transfer_progress(transfer['id'], status='completed')
+            return jsonify({'error': 'All songs processed'}), 400
         
-        # Add delay to respect API limits
-        time.sleep(0.1)
+        with tracer.span('transfer.song', transfer_id=transfer['id'], song_id=song['id']):
+            result, progress = process_transfer_song(
+                get_transfer_service(session_id), transfer, song, total_songs, 'processing'
+            )
         
         return jsonify({
             'success': True,
             'result': result,
-            'progress': {
-                'current': new_processed,
-                'total': len(songs),
-                'successful': new_successful,
-                'failed': new_failed,
-                'percentage': (new_processed / len(songs)) * 100
-            },
-            'completed': new_processed >= len(songs)
+            'progress': progress,
+            'completed': progress['current'] >= total_songs
         })
         
+    except QuotaExceeded as e:
+        db_manager.update_transfer_progress(transfer['id'], status='quota_paused')
+        return jsonify({'error': str(e), 'quota': quota_ledger.summary()}), 429
+    except UpstreamUnavailable as e:
+        # The song was not recorded, so the browser can simply ask again later
+        return jsonify({'error': str(e), 'retry_after': CIRCUIT_RESET_SECONDS}), 503
+    except LeaseLost as e:
+        return jsonify({'error': str(e), 'retry_after': 1}), 409
     except Exception as e:
         logger.error(f"Error processing transfer: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        db_manager.release_transfer_lease(transfer['id'], owner)
+
+def build_transfer_progress(transfer):
+    """Build the progress payload shared by the status endpoint and the event stream"""
+    total_songs = transfer['total_songs'] or 0
+    return {
+        'current': transfer['processed'],
+        'total': total_songs,
+        'successful': transfer['successful'],
+        'failed': transfer['failed'],
+        'already_present': transfer['processed'] - transfer['successful'] - transfer['failed'],
+        'removed': transfer.get('removed') or 0,
+        'percentage': (transfer['processed'] / total_songs) * 100 if total_songs > 0 else 0
+    }
+
+def get_watched_transfer(session_id):
+    """Transfer named by the `transfer_id` query parameter, else the session's latest one
+
+    Finished transfers are returned too, so watchers see them complete or fail.
+    """
+    transfer_id = request.args.get('transfer_id', type=int)
+    if transfer_id is None:
+        return db_manager.get_latest_transfer(session_id)
+    
+    transfer = db_manager.get_transfer(transfer_id)
+    return transfer if transfer and transfer['session_id'] == session_id else None
 
 @app.route('/api/transfer/status')
 def transfer_status():
-    """Get current transfer status"""
+    """Get the status of a transfer (`transfer_id`, else the session's latest)
+
+    Pass `since=<result id>` to receive only results appended after that id,
+    or `summary=1` to skip the results entirely.
+    """
     session_id = get_session_id()
-    transfer = db_manager.get_active_transfer(session_id)
+    transfer = get_watched_transfer(session_id)
     
     if not transfer:
-        return jsonify({'error': 'No transfer in progress'}), 404
+        return jsonify({'error': 'No transfer found'}), 404
     
-    songs = db_manager.get_songs(session_id)
-    results = db_manager.get_transfer_results(transfer['id'])
+    since_id = request.args.get('since', 0, type=int)
+    results = [] if request.args.get('summary') else db_manager.get_transfer_results(transfer['id'], since_id=since_id)
     
     return jsonify({
+        'transfer_id': transfer['id'],
         'playlist_id': transfer['playlist_id'],
         'playlist_name': transfer['playlist_name'],
-        'progress': {
-            'current': transfer['processed'],
-            'total': len(songs),
-            'successful': transfer['successful'],
-            'failed': transfer['failed'],
-            'percentage': (transfer['processed'] / len(songs)) * 100 if len(songs) > 0 else 0
-        },
+        'progress': build_transfer_progress(transfer),
+        'status': transfer['status'],
         'completed': transfer['status'] == 'completed',
-        'results': results
+        'quota': quota_ledger.summary(),
+        'results': results,
+        'last_result_id': results[-1]['id'] if results else since_id
     })
 
+@app.route('/api/transfer/events')
+def transfer_events():
+    """Stream a transfer's progress and newly appended results as Server-Sent Events"""
+    session_id = get_session_id()
+    transfer = get_watched_transfer(session_id)
+    
+    if not transfer:
+        return jsonify({'error': 'No transfer found'}), 404
+    
+    transfer_id = transfer['id']
+    # EventSource resends the last event id when it reconnects
+    since_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('since', 0, type=int)
+    
+    def format_event(event, data, event_id=None):
+        lines = [f'event: {event}']
+        if event_id is not None:
+            lines.append(f'id: {event_id}')
+        lines.append(f'data: {json.dumps(data)}')
+        return '\n'.join(lines) + '\n\n'
+    
+    def generate():
+        last_result_id = since_id
+        last_progress = None
+        last_sent = time.monotonic()
+        
+        while True:
+            current = db_manager.get_transfer(transfer_id)
+            if not current:
+                yield format_event('end', {'status': 'missing'})
+                return
+            
+            for result in db_manager.get_transfer_results(transfer_id, since_id=last_result_id):
+                last_result_id = result['id']
+                yield format_event('result', result, event_id=last_result_id)
+                last_sent = time.monotonic()
+            
+            progress = {
+                'progress': build_transfer_progress(current),
+                'status': current['status'],
+                'completed': current['status'] == 'completed'
+            }
+            if current['status'] == 'quota_paused':
+                progress['quota'] = quota_ledger.summary()
+            
+            if progress != last_progress:
+                yield format_event('progress', progress)
+                last_progress = progress
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= TRANSFER_EVENTS_HEARTBEAT:
+                # Comment line keeps proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+                last_sent = time.monotonic()
+            
+            if current['status'] in ('completed', 'failed'):
+                yield format_event('end', {'status': current['status']})
+                return
+            
+            time.sleep(TRANSFER_EVENTS_INTERVAL)
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/transfer/rematch', methods=['POST'])
+def rematch_song():
+    """Replace a song's match with one of its stored runner-up candidates (no new search)
+
+    The candidate is added to the playlist first; only once that worked is the
+    previous match's playlist item removed, so a failed swap leaves the old match in
+    place.
+    """
+    session_id = get_session_id()
+    data = request.get_json() or {}
+    
+    result = db_manager.get_transfer_result(data.get('result_id'), session_id)
+    if not result:
+        return jsonify({'error': 'Transfer result not found'}), 404
+    
+    candidates = json.loads(result['match_candidates'] or '[]')
+    if data.get('video_id'):
+        candidates_by_id = {candidate['video_id']: candidate for candidate in candidates}
+        candidate = candidates_by_id.get(data['video_id'])
+    else:
+        candidate = candidates[0] if candidates else None
+    
+    if not candidate:
+        return jsonify({'error': 'No other candidate available', 'candidates': candidates}), 400
+    
+    try:
+        service = get_transfer_service(session_id)
+        added = service.add_video_to_playlist(result['playlist_id'], candidate['video_id'])
+        
+        if result['added_to_playlist'] and not added:
+            return jsonify({'error': 'Could not add the candidate to the playlist; the previous match was kept'}), 502
+        
+        removed_previous = False
+        if result['added_to_playlist'] and added and result['youtube_video_id'] != candidate['video_id']:
+            # Drop one copy of the wrong video; other songs matched to it keep theirs
+            playlist_items = service.find_playlist_items(result['playlist_id'], result['youtube_video_id'])
+            removed_previous = bool(playlist_items) and service.remove_playlist_item(playlist_items[0])
+        
+        # The replaced match stays available as a candidate
+        remaining = [other for other in candidates if other['video_id'] != candidate['video_id']]
+        if result['youtube_video_id']:
+            remaining.insert(0, {
+                'video_id': result['youtube_video_id'],
+                'title': result['youtube_title'],
+                'channel': result['youtube_channel'],
+                'thumbnail': result['youtube_thumbnail'],
+                'score': result['match_score']
+            })
+        
+        youtube_result = dict(candidate, candidates=remaining)
+        youtube_result.pop('duration_ms', None)
+        db_manager.update_transfer_result_match(
+            result['id'], youtube_result, 'success' if added else 'add_failed', added
+        )
+        if added:
+            # Remember the user's choice for everyone else who likes this track
+            db_manager.store_cached_match(result['spotify_id'], result['song_name'], result['artist'], youtube_result)
+        
+        return jsonify({
+            'success': added,
+            'youtube_match': candidate,
+            'candidates': remaining,
+            'removed_previous': removed_previous
+        })
+        
+    except QuotaExceeded as e:
+        return jsonify({'error': str(e), 'quota': quota_ledger.summary()}), 429
+    except UpstreamUnavailable as e:
+        return jsonify({'error': str(e), 'retry_after': CIRCUIT_RESET_SECONDS}), 503
+    except Exception as e:
+        logger.error(f"Error re-matching result {result['id']}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/disconnect/<service>')
 def disconnect_service(service):
     """Disconnect from a service"""
@@ -890,6 +4353,7 @@ def disconnect_service(service):
     elif service == 'youtube':
         db_manager.disconnect_service(session_id, 'youtube')
         flash('Disconnected from YouTube', 'info')
+    client_registry.invalidate(session_id)
     
     return redirect(url_for('index'))
 
@@ -898,6 +4362,7 @@ def clear_session():
     """Clear all session data"""
     session_id = get_session_id()
     db_manager.clear_session_data(session_id)
+    client_registry.invalidate(session_id)
     session.clear()
     flash('Session cleared', 'info')
     return redirect(url_for('index'))
@@ -0,0 +1,300 @@
+"""In-process stand-ins for the Spotify Web API and the YouTube Data API.
+
+Both servers answer just the endpoints the transfer engine calls, with synthetic
+data, a configurable per-request latency and error rate, and (for YouTube) a
+daily quota that answers 403 quotaExceeded once it is spent.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from email.parser import Parser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+YOUTUBE_COSTS = {
+    'search': 100,
+    'videos': 1,
+    'playlists': 50,
+    'playlistItems': 50
+}
+
+# Listing is cheap; inserting and deleting are not
+YOUTUBE_LIST_COST = 1
+PLAYLIST_PAGE_SIZE = 50
+
+TRACK_DURATION_MS = 210000
+
+def synthetic_track(index):
+    """Deterministic saved-tracks item for library position `index`"""
+    return {
+        # Newest first, like the real endpoint
+        'added_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1700000000 - index * 60)),
+        'track': {
+            'id': f"track{index:07d}",
+            'name': f"Song {index}",
+            'artists': [{'name': f"Artist {index % 997}"}],
+            'album': {'name': f"Album {index % 211}"},
+            'duration_ms': TRACK_DURATION_MS,
+            'external_urls': {'spotify': f"https://open.spotify.com/track/track{index:07d}"}
+        }
+    }
+
+def video_id_for(query):
+    return hashlib.md5(query.encode('utf-8')).hexdigest()[:11]
+
+class FakeAPIServer:
+    """Threaded HTTP server running on 127.0.0.1 in a daemon thread"""
+
+    def __init__(self, handler_class, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(handler_class):
+            api = server
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+class JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    api = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+class SpotifyHandler(JSONHandler):
+    """GET /v1/me/tracks over a library of `api.library_size` synthetic tracks"""
+
+    def do_GET(self):
+        self.api.wait()
+        url = urlparse(self.path)
+        if url.path != '/v1/me/tracks':
+            return self.send_json(404, {'error': {'status': 404, 'message': 'Not found'}})
+        if self.api.should_fail():
+            return self.send_json(503, {'error': {'status': 503, 'message': 'Service unavailable'}}, {'Retry-After': '0'})
+
+        params = parse_qs(url.query)
+        limit = int(params.get('limit', ['20'])[0])
+        offset = int(params.get('offset', ['0'])[0])
+        total = self.api.library_size
+        end = min(offset + limit, total)
+
+        self.send_json(200, {
+            'items': [synthetic_track(index) for index in range(offset, end)],
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'next': f"{self.api.url}/v1/me/tracks?offset={end}&limit={limit}" if end < total else None
+        })
+
+class YouTubeHandler(JSONHandler):
+    """search, videos, playlists and playlistItems (plain and batched) with a quota budget
+
+    Playlists and their items are remembered, so playlists.list (by id or mine),
+    playlistItems.list (paged or filtered by videoId) and playlistItems.delete
+    answer like the real API.
+    """
+
+    def charge(self, resource, method):
+        with self.api._lock:
+            cost = YOUTUBE_LIST_COST if method == 'GET' and resource.startswith('playlist') else YOUTUBE_COSTS[resource]
+            if self.api.quota is not None and self.api.quota_used + cost > self.api.quota:
+                return False
+            self.api.quota_used += cost
+            return True
+
+    def handle_call(self, method, path, body):
+        """Answer one API call, returning (status, payload, headers)"""
+        url = urlparse(path)
+        resource = url.path.rstrip('/').rsplit('/', 1)[-1]
+        if resource not in YOUTUBE_COSTS:
+            return 404, {'error': {'code': 404, 'errors': [{'reason': 'notFound'}]}}, {}
+        if self.api.should_fail():
+            return 503, {'error': {'code': 503, 'errors': [{'reason': 'backendError'}]}}, {}
+        if not self.charge(resource, method):
+            return 403, {'error': {'code': 403, 'errors': [{'reason': 'quotaExceeded'}]}}, {}
+
+        params = parse_qs(url.query)
+        if resource == 'search':
+            query = params.get('q', [''])[0]
+            count = int(params.get('maxResults', ['5'])[0])
+            return 200, {'items': [{
+                'id': {'videoId': video_id_for(f"{query}#{rank}")},
+                'snippet': {
+                    'title': f"{query} (Official Audio)" if rank == 0 else f"{query} live",
+                    'channelTitle': 'Artist - Topic' if rank == 0 else 'Someone',
+                    'thumbnails': {'default': {'url': 'https://i.ytimg.com/vi/x/default.jpg'}}
+                }
+            } for rank in range(count)]}, {}
+        if resource == 'videos':
+            ids = params.get('id', [''])[0].split(',')
+            return 200, {'items': [
+                {'id': video_id, 'contentDetails': {'duration': 'PT3M30S'}} for video_id in ids if video_id
+            ]}, {}
+        if resource == 'playlists' and method == 'GET':
+            return 200, self.list_playlists(params), {}
+        if resource == 'playlists':
+            snippet = json.loads(body or b'{}').get('snippet', {})
+            with self.api._lock:
+                playlist_id = 'PL' + video_id_for(f"{time.time()}#{len(self.api.playlists)}")
+                self.api.playlists[playlist_id] = snippet
+                self.api.playlist_items[playlist_id] = []
+            return 200, {'id': playlist_id}, {}
+
+        if method == 'GET':
+            return 200, self.list_playlist_items(params), {}
+        if method == 'DELETE':
+            item_id = params.get('id', [''])[0]
+            with self.api._lock:
+                for items in self.api.playlist_items.values():
+                    items[:] = [item for item in items if item[0] != item_id]
+            return 204, None, {}
+
+        snippet = json.loads(body or b'{}').get('snippet', {})
+        item_id = video_id_for(body.decode('utf-8', 'ignore') + str(self.api.inserted))
+        with self.api._lock:
+            self.api.inserted += 1
+            self.api.playlist_items.setdefault(snippet.get('playlistId'), []).append(
+                (item_id, snippet.get('resourceId', {}).get('videoId'))
+            )
+        return 200, {'id': item_id, 'kind': 'youtube#playlistItem'}, {}
+
+    def list_playlists(self, params):
+        with self.api._lock:
+            if params.get('mine', [''])[0] == 'true':
+                playlist_ids = list(self.api.playlists)
+            else:
+                playlist_ids = [playlist_id for playlist_id in params.get('id', [''])[0].split(',')
+                                if playlist_id in self.api.playlist_items]
+            offset = int(params.get('pageToken', ['0'])[0])
+            page = playlist_ids[offset:offset + PLAYLIST_PAGE_SIZE]
+            response = {'items': [{
+                'id': playlist_id,
+                'snippet': {
+                    'title': f"Playlist {playlist_id}",
+                    **self.api.playlists.get(playlist_id, {})
+                },
+                'contentDetails': {'itemCount': len(self.api.playlist_items[playlist_id])}
+            } for playlist_id in page]}
+        if offset + PLAYLIST_PAGE_SIZE < len(playlist_ids):
+            response['nextPageToken'] = str(offset + PLAYLIST_PAGE_SIZE)
+        return response
+
+    def list_playlist_items(self, params):
+        playlist_id = params.get('playlistId', [''])[0]
+        video_id = params.get('videoId', [None])[0]
+        offset = int(params.get('pageToken', ['0'])[0])
+        with self.api._lock:
+            items = [item for item in self.api.playlist_items.get(playlist_id, [])
+                     if video_id is None or item[1] == video_id]
+        page = items[offset:offset + PLAYLIST_PAGE_SIZE]
+        response = {'items': [{'id': item_id, 'contentDetails': {'videoId': item_video_id}}
+                              for item_id, item_video_id in page]}
+        if offset + PLAYLIST_PAGE_SIZE < len(items):
+            response['nextPageToken'] = str(offset + PLAYLIST_PAGE_SIZE)
+        return response
+
+    def do_GET(self):
+        self.api.wait()
+        status, payload, headers = self.handle_call('GET', self.path, b'')
+        self.send_json(status, payload, headers)
+
+    def do_DELETE(self):
+        self.api.wait()
+        status, payload, headers = self.handle_call('DELETE', self.path, b'')
+        if payload is None:
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_json(status, payload, headers)
+
+    def do_POST(self):
+        self.api.wait()
+        body = self.read_body()
+        if urlparse(self.path).path != '/batch':
+            status, payload, headers = self.handle_call('POST', self.path, body)
+            return self.send_json(status, payload, headers)
+
+        # multipart/mixed batch: every part is an application/http request
+        message = Parser().parsestr(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n" + body.decode('utf-8')
+        )
+        boundary = 'batch_response_boundary'
+        parts = []
+        for part in message.get_payload():
+            request_line, rest = part.get_payload().split('\n', 1)
+            method, path = request_line.split(' ')[:2]
+            part_body = rest.split('\n\n', 1)[1] if '\n\n' in rest else ''
+            status, payload, _ = self.handle_call(method, path, part_body.encode('utf-8'))
+            content_id = part['Content-ID']
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id[1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+
+        response = (''.join(parts) + f"--{boundary}--\r\n").encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/mixed; boundary={boundary}')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+def start_fake_spotify(library_size, latency=0.0, error_rate=0.0):
+    server = FakeAPIServer(SpotifyHandler, latency, error_rate)
+    server.library_size = library_size
+    return server.start()
+
+def start_fake_youtube(latency=0.0, error_rate=0.0, quota=None):
+    server = FakeAPIServer(YouTubeHandler, latency, error_rate)
+    server.quota = quota
+    server.quota_used = 0
+    server.inserted = 0
+    server.playlists = {}
+    server.playlist_items = {}
+    return server.start()
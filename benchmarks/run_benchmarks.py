@@ -0,0 +1,293 @@
+"""Micro-benchmarks for the transfer engine against local Spotify/YouTube stand-ins.
+
+Runs the Spotify fetch, YouTube search, playlist insert and DatabaseManager write
+paths (plus a whole background transfer) over synthetic libraries, against the
+fake servers in fake_apis.py, with a throwaway SQLite database:
+
+    python benchmarks/run_benchmarks.py --sizes 1000,10000,50000 --latency-ms 5
+
+Reports items/sec per benchmark and the process's peak RSS. Use --json to save
+the results for comparison between commits.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_apis import start_fake_spotify, start_fake_youtube
+
+BENCHMARKS = [
+    'spotify_fetch', 'spotify_fetch_parallel',
+    'db_store_songs', 'db_read_songs', 'db_write_results',
+    'youtube_search', 'youtube_search_concurrent',
+    'playlist_insert', 'playlist_insert_batch',
+    'transfer'
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,50000', help='comma-separated library sizes')
+    parser.add_argument('--api-songs', type=int, default=200,
+                        help='songs per YouTube benchmark (searches and inserts are far slower than fetches)')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='fake server latency per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--quota', type=int, default=None, help='YouTube quota units before 403 quotaExceeded')
+    parser.add_argument('--only', default=None, help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--json', dest='json_path', default=None, help='write results to this file')
+    return parser.parse_args()
+
+def configure_environment():
+    """Point the app at a scratch database and lift limits that would only measure sleeping"""
+    os.chdir(tempfile.mkdtemp(prefix='music-transfer-bench-'))
+    os.environ.update({
+        'TRANSFER_WORKER_MODE': 'off',
+        'TOKEN_REFRESH_INTERVAL': '0',
+        'YOUTUBE_RATE_LIMIT': '1000000',
+        'YOUTUBE_RATE_BURST': '1000000',
+        'YOUTUBE_DAILY_QUOTA': '1000000000',
+        'API_RETRY_BASE_DELAY': '0.01',
+        'CIRCUIT_RESET_SECONDS': '1'
+    })
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def timed(name, size, items, unit, func):
+    started_at = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started_at
+    return {
+        'benchmark': name,
+        'library_size': size,
+        'items': items,
+        'seconds': round(seconds, 4),
+        'rate': round(items / seconds, 1) if seconds else None,
+        'unit': unit,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+class BenchmarkContext:
+    """One library size: fake servers, a connected service and a session with stored songs"""
+
+    def __init__(self, app, size, args):
+        self.app = app
+        self.size = size
+        self.args = args
+        latency = args.latency_ms / 1000
+        self.spotify_server = start_fake_spotify(size, latency, args.error_rate)
+        self.youtube_server = start_fake_youtube(latency, args.error_rate, args.quota)
+
+        # Clients built from here on (including the worker's) talk to the fake YouTube
+        app.get_youtube_discovery_document()['rootUrl'] = self.youtube_server.url + '/'
+
+        self.session_id = f"bench-{size}"
+        self.connect_session(self.session_id)
+        self.service = app.client_registry.get(self.session_id)
+        self.service.spotify.prefix = self.spotify_server.url + '/v1/'
+        self.songs = []
+
+    def connect_session(self, session_id):
+        """Store long-lived fake tokens for a session, as the OAuth callbacks would"""
+        far_future = datetime.utcnow() + timedelta(days=1)
+        self.app.db_manager.get_or_create_session(session_id)
+        self.app.db_manager.update_spotify_token(session_id, {
+            'access_token': 'bench', 'refresh_token': 'bench', 'expires_at': int(far_future.timestamp())
+        }, 'bench-user')
+        self.app.db_manager.update_youtube_credentials(session_id, {
+            'token': 'bench', 'refresh_token': 'bench', 'token_uri': 'https://oauth2.googleapis.com/token',
+            'client_id': 'bench', 'client_secret': 'bench', 'scopes': self.app.YOUTUBE_SCOPES,
+            'expiry': far_future.isoformat()
+        })
+
+    def close(self):
+        self.spotify_server.stop()
+        self.youtube_server.stop()
+
+    def api_songs(self):
+        return self.songs[:min(self.size, self.args.api_songs)]
+
+    def run(self, name):
+        return getattr(self, f"bench_{name}")()
+
+    def bench_spotify_fetch(self):
+        def fetch():
+            self.songs = self.service.get_spotify_liked_songs()
+        return timed('spotify_fetch', self.size, self.size, 'songs/s', fetch)
+
+    def bench_spotify_fetch_parallel(self):
+        def fetch():
+            self.songs = self.service.get_spotify_liked_songs_parallel()
+        return timed('spotify_fetch_parallel', self.size, self.size, 'songs/s', fetch)
+
+    def ensure_songs(self):
+        if not self.songs:
+            self.songs = self.service.get_spotify_liked_songs_parallel()
+
+    def bench_db_store_songs(self):
+        self.ensure_songs()
+        return timed('db_store_songs', self.size, len(self.songs), 'rows/s',
+                     lambda: self.app.db_manager.store_songs(self.session_id, self.songs))
+
+    def bench_db_read_songs(self):
+        self.ensure_songs()
+        self.app.db_manager.store_songs(self.session_id, self.songs)
+
+        def read():
+            after_id = 0
+            while True:
+                window = self.app.db_manager.get_songs(self.session_id, after_id=after_id,
+                                                       limit=self.app.TRANSFER_SONG_WINDOW)
+                if not window:
+                    break
+                after_id = window[-1]['db_id']
+        return timed('db_read_songs', self.size, len(self.songs), 'rows/s', read)
+
+    def bench_db_write_results(self):
+        self.ensure_songs()
+        app = self.app
+        app.db_manager.store_songs(self.session_id, self.songs)
+        stored = app.db_manager.get_songs(self.session_id)
+        transfer_id = app.db_manager.create_transfer(
+            self.session_id, 'PLbench', 'Bench', len(stored), status='running',
+            max_song_id=stored[-1]['db_id']
+        )
+        transfer = app.db_manager.get_transfer(transfer_id)
+        match = {'video_id': 'v', 'title': 't', 'channel': 'c', 'thumbnail': 'u', 'score': 1.0, 'candidates': []}
+
+        def write():
+            buffer = app.TransferResultBuffer(app.db_manager, transfer)
+            for song in stored:
+                transfer['processed'] += 1
+                transfer['successful'] += 1
+                transfer['last_song_id'] = song['db_id']
+                buffer.add(song['db_id'], match, 'success', True)
+            buffer.flush()
+        return timed('db_write_results', self.size, len(stored), 'rows/s', write)
+
+    def bench_youtube_search(self):
+        self.ensure_songs()
+        songs = self.api_songs()
+
+        def search():
+            for song in songs:
+                self.service.search_youtube_video(song['name'], song['artist'], duration_ms=song['duration_ms'])
+        return timed('youtube_search', self.size, len(songs), 'songs/s', search)
+
+    def bench_youtube_search_concurrent(self):
+        self.ensure_songs()
+        songs = self.api_songs()
+        return timed('youtube_search_concurrent', self.size, len(songs), 'songs/s',
+                     lambda: self.service.search_youtube_videos(songs))
+
+    def bench_playlist_insert(self):
+        self.ensure_songs()
+        songs = self.api_songs()
+
+        def insert():
+            for song in songs:
+                self.service.add_video_to_playlist('PLbench', song['id'])
+        return timed('playlist_insert', self.size, len(songs), 'songs/s', insert)
+
+    def bench_playlist_insert_batch(self):
+        self.ensure_songs()
+        songs = self.api_songs()
+        return timed('playlist_insert_batch', self.size, len(songs), 'songs/s',
+                     lambda: self.service.add_videos_to_playlist('PLbench', [song['id'] for song in songs]))
+
+    def bench_transfer(self):
+        """Whole background transfer: cache lookups, searches, batched inserts, result writes
+
+        When --quota runs out the transfer pauses, as it would in production, and the
+        songs processed before the pause are reported.
+        """
+        self.ensure_songs()
+        app = self.app
+        songs = self.api_songs()
+        # A fresh session and an empty match cache, so nothing is answered from earlier benchmarks
+        session_id = f"{self.session_id}-transfer"
+        self.connect_session(session_id)
+        app.db_manager.store_songs(session_id, songs)
+        stored = app.db_manager.get_songs(session_id)
+        transfer_id = app.db_manager.create_transfer(
+            session_id, 'PLbench', 'Bench', len(stored), status='running', max_song_id=stored[-1]['db_id']
+        )
+        with app.db_manager.get_db_connection() as conn:
+            conn.execute('DELETE FROM match_cache')
+            conn.commit()
+        # Lease this transfer directly; claiming could pick up one left behind by another benchmark
+        transfer = app.db_manager.acquire_transfer_lease(transfer_id, 'bench', app.TRANSFER_LEASE_SECONDS)
+    
+        worker = app.TransferWorker(app.db_manager)
+        paused = []
+
+        def run():
+            try:
+                worker.run_transfer(transfer)
+            except app.QuotaExceeded as e:
+                paused.append(e)
+
+        result = timed('transfer', self.size, len(songs), 'songs/s', run)
+        if paused:
+            processed = app.db_manager.get_transfer(transfer_id)['processed']
+            result.update(
+                items=processed,
+                rate=round(processed / result['seconds'], 1) if result['seconds'] else None,
+                note='quota paused'
+            )
+        return result
+
+def print_table(results):
+    header = f"{'benchmark':<28}{'size':>8}{'items':>8}{'seconds':>10}{'rate':>12}  {'unit':<9}{'peak MB':>9}  note"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{result['benchmark']:<28}{result['library_size']:>8}{result['items']:>8}"
+              f"{result['seconds']:>10.3f}{result['rate'] or 0:>12.1f}  {result['unit']:<9}{result['peak_rss_mb']:>9.1f}"
+              f"  {result.get('note', '')}".rstrip())
+
+def main():
+    args = parse_args()
+    if args.json_path:
+        args.json_path = os.path.abspath(args.json_path)
+    configure_environment()
+
+    import app
+
+    selected = args.only.split(',') if args.only else BENCHMARKS
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    for size in [int(size) for size in args.sizes.split(',')]:
+        context = BenchmarkContext(app, size, args)
+        try:
+            for name in [name for name in BENCHMARKS if name in selected]:
+                try:
+                    results.append(context.run(name))
+                except Exception as e:
+                    app.logger.error(f"Benchmark {name} ({size} songs) failed: {e}")
+        finally:
+            context.close()
+
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'latency_ms': args.latency_ms,
+                'error_rate': args.error_rate,
+                'quota': args.quota,
+                'results': results
+            }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Compile curated Spotify -> YouTube mappings into the offline mapping index.
+
+Reads CSV files (with a header row) or JSON lines files with a Spotify track id
+and/or an ISRC and a YouTube video id per row, and writes the sorted index that
+transfers consult before searching:
+
+    python import_mappings.py past_migrations.csv more.jsonl --output mapping_index.bin
+
+Accepted columns are spotify_id (or spotify_track_id), isrc and youtube_video_id
+(or video_id, which may also be a YouTube URL). When a track is listed more than
+once the last row wins. Running workers pick up the new index on their next lookup.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+# Importing the app must not start the in-process transfer worker pool
+os.environ['TRANSFER_WORKER_MODE'] = 'off'
+
+from app import build_mapping_index, logger, MAPPING_INDEX_FILE
+
+VIDEO_ID_PATTERN = re.compile(r'(?:v=|youtu\.be/|^)([A-Za-z0-9_-]{11})(?:$|[&?#])')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help='.csv or .jsonl files, applied in order')
+    parser.add_argument('--output', default=MAPPING_INDEX_FILE, help='index file to write')
+    return parser.parse_args()
+
+def read_rows(path):
+    """Yield each row of a CSV or JSON lines file as a dict"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson', '.json')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+def read_mappings(paths, stats):
+    """Yield (spotify_id, isrc, video_id) for every usable row, counting the rest in `stats`"""
+    for path in paths:
+        for row in read_rows(path):
+            spotify_id = (row.get('spotify_id') or row.get('spotify_track_id') or '').strip() or None
+            isrc = (row.get('isrc') or '').strip() or None
+            match = VIDEO_ID_PATTERN.search((row.get('youtube_video_id') or row.get('video_id') or '').strip())
+
+            if not match or not (spotify_id or isrc):
+                stats['skipped'] += 1
+                continue
+            stats['rows'] += 1
+            yield spotify_id, isrc, match.group(1)
+
+def main():
+    args = parse_args()
+    stats = {'rows': 0, 'skipped': 0}
+    started_at = time.time()
+
+    try:
+        keys = build_mapping_index(read_mappings(args.inputs, stats), args.output)
+    except (OSError, ValueError, csv.Error) as e:
+        logger.error(f"Error importing mappings: {e}")
+        sys.exit(1)
+
+    logger.info(
+        f"Wrote {keys} keys from {stats['rows']} rows to {args.output} in {time.time() - started_at:.1f}s "
+        f"({stats['skipped']} rows skipped)"
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+"""Standalone background transfer worker.
+
+Run alongside the web app (with TRANSFER_WORKER_MODE=external) to drain queued
+transfers from the database in a separate process:
+
+    python worker.py
+"""
+import os
+
+# The web app must not start its own in-process pool when imported from here
+os.environ['TRANSFER_WORKER_MODE'] = 'external'
+
+from app import transfer_worker, logger
+
+if __name__ == '__main__':
+    logger.info("🎵 Music Transfer worker starting...")
+    transfer_worker.run_forever()